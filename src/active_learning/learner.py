@@ -6,7 +6,13 @@ import numpy as np
 
 from src.active_learning.selector import Selector, SelectorName, resolve_selector
 from src.config import register_config
-from src.models.classifier import Classifier, resolve_classifier
+from src.models.classifier import (
+    CachingClassifier,
+    Classifier,
+    DiagnosedClassifier,
+    IncrementalClassifier,
+    resolve_classifier,
+)
 from src.models.forest.forest import RandomForest
 
 
@@ -15,6 +21,7 @@ class ExperimentResults:
     labeled_ratio: list[float]
     y_test: np.ndarray
     proba: np.ndarray
+    diagnostics: list[dict[str, float]] = field(default_factory=list[dict[str, float]])
 
 
 @register_config(
@@ -63,6 +70,12 @@ class ActiveLearner:
     def loop(
         self, X_test: np.ndarray, y_test: np.ndarray, ctx: MultiprocessingContext | None = None
     ) -> None:
+        # pool and test set stay the same for the whole run, predictions on them are cached
+        # by classifiers whose updates keep part of their previous fit
+        if isinstance(self._classifier, CachingClassifier):
+            self._classifier.register(self._data.X_train)
+            self._classifier.register(X_test)
+
         self._classifier.fit(
             self._data.X_train[self._data.labeled_mask], self._data.y_train[self._data.labeled_mask]
         )
@@ -80,10 +93,16 @@ class ActiveLearner:
 
             self._data.labeled_mask[samples_indices] = True
 
-            self._classifier.fit(
-                self._data.X_train[self._data.labeled_mask],
-                self._data.y_train[self._data.labeled_mask],
-            )
+            # classifiers that would refit everything anyway keep the pool order of fit()
+            if isinstance(self._classifier, IncrementalClassifier) and self._classifier.incremental:
+                self._classifier.update(
+                    self._data.X_train[samples_indices], self._data.y_train[samples_indices]
+                )
+            else:
+                self._classifier.fit(
+                    self._data.X_train[self._data.labeled_mask],
+                    self._data.y_train[self._data.labeled_mask],
+                )
 
             if self._should_store_results:
                 self._store_results(X_test, i)
@@ -93,7 +112,10 @@ class ActiveLearner:
 
     def _prepare_results_arrays(self, X_test: np.ndarray, y_test: np.ndarray, n_iter: int) -> None:
         self.results = ExperimentResults(
-            y_test=y_test, labeled_ratio=[0] * n_iter, proba=np.empty((n_iter, y_test.shape[0]))
+            y_test=y_test,
+            labeled_ratio=[0] * n_iter,
+            proba=np.empty((n_iter, y_test.shape[0])),
+            diagnostics=[{} for _ in range(n_iter)],
         )
 
         self._store_results(X_test, 0)
@@ -104,6 +126,9 @@ class ActiveLearner:
         self.results.labeled_ratio[iteration] = self._get_labeled_ratio()
         self.results.proba[iteration] = majority_class_proba
 
+        if isinstance(self._classifier, DiagnosedClassifier):
+            self.results.diagnostics[iteration] = self._classifier.diagnostics()
+
     def _get_labeled_ratio(self) -> float:
         labeled_indices = np.flatnonzero(self._data.labeled_mask)
         unlabeled_indices = np.flatnonzero(~self._data.labeled_mask)
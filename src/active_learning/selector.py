@@ -2,7 +2,7 @@ from typing import Literal, Protocol
 
 import numpy as np
 
-from src.models.classifier import Classifier
+from src.models.classifier import CachingClassifier, Classifier
 
 type SelectorName = Literal["uncertainty", "diversity", "random"]
 SELECTORS = ["uncertainty", "diversity", "random"]
@@ -26,11 +26,15 @@ class UncertaintySelector:
         self, X_pool: np.ndarray, labeled_mask: np.ndarray, batch_size: int = 5
     ) -> np.ndarray:
         unlabeled_indices = np.flatnonzero(~labeled_mask)
-        X_unlabeled = X_pool[unlabeled_indices, :]
 
-        proba = self.classifier.predict_proba(X_unlabeled)
+        # a registered pool is predicted whole from cached tree leaves, not re-evaluated
+        if isinstance(self.classifier, CachingClassifier) and self.classifier.is_registered(X_pool):
+            proba = self.classifier.predict_proba(X_pool)[unlabeled_indices]
+        else:
+            proba = self.classifier.predict_proba(X_pool[unlabeled_indices, :])
+
         max_proba = np.max(proba, axis=1)
-        size = min(batch_size, X_unlabeled.shape[0])
+        size = min(batch_size, unlabeled_indices.shape[0])
         relative_indices = np.argsort(1 - max_proba)[-size:]
 
         return unlabeled_indices[relative_indices]
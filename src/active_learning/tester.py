@@ -93,6 +93,10 @@ class LearnerTester:
         self._save_prs(prs)
         logger.info("Precision-recall curves saved to .csv files")
 
+        if any(any(trial.diagnostics) for trial in trials):
+            self._save_diagnostics(trials)
+            logger.info("Classifier diagnostics saved to .csv file")
+
     def _get_splits(self, X: np.ndarray, y: np.ndarray) -> LearningBatch:
         data: list[LearningData] = []
         inputs: list[np.ndarray] = []
@@ -209,6 +213,20 @@ class LearnerTester:
                 self._save_dir / f"precision-recall-{round(pr.threshold, 2) * 100}.csv", index=False
             )
 
+    def _save_diagnostics(self, trials: list[ExperimentResults]) -> None:
+        # every diagnostic is averaged per iteration over the trials that report it
+        names = dict.fromkeys(name for trial in trials for row in trial.diagnostics for name in row)
+        data: dict[str, list[float] | np.ndarray] = {"labeled_ratio": trials[0].labeled_ratio}
+        for name in names:
+            values = np.array(
+                [[row.get(name, np.nan) for row in trial.diagnostics] for trial in trials]
+            )
+            reported = np.count_nonzero(~np.isnan(values), axis=0)
+            totals = np.nansum(values, axis=0)
+            data[name] = np.where(reported > 0, totals / np.maximum(reported, 1), np.nan)
+
+        pd.DataFrame(data).to_csv(self._save_dir / "diagnostics.csv", index=False)
+
     def _run_single_learner(
         self,
         learning_data: LearningData,
@@ -0,0 +1,391 @@
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any, cast
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import average_precision_score
+from sklearn.model_selection import train_test_split
+
+from src.active_learning.learner import ActiveLearner, ActiveLearnerConfig, LearningData
+from src.models.boosting.boosting import GradientBoosting, GradientBoostingConfig
+from src.models.forest.cart import CART, CARTConfig
+from src.models.forest.forest import RandomForest, RandomForestConfig
+from src.models.forest.util import gini_impurity
+from src.models.svm.svm import SVM, SVMConfig
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="Benchmarks")
+    parser.add_argument("--data", default="data/active_learning/flowers.csv", help="Dataset path")
+    parser.add_argument("--samples", type=int, default=None, help="Number of rows to use")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repetitions per variant")
+    parser.add_argument("--seed", type=int, default=42)
+
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    subparsers.add_parser("split", help="Root node split search: per-sample loop vs vectorized")
+
+    histogram = subparsers.add_parser("histogram", help="Forest fit: exact vs histogram splitter")
+    histogram.add_argument("--trees", type=int, default=20, help="Number of trees")
+    histogram.add_argument("--bins", type=int, nargs="+", default=[256, 64], help="Bin counts")
+
+    growth = subparsers.add_parser("growth", help="Forest fit: depth-first vs leaf budgets")
+    growth.add_argument("--trees", type=int, default=20, help="Number of trees")
+    growth.add_argument(
+        "--leaves", type=int, nargs="+", default=[64, 16], help="max_leaf_nodes values"
+    )
+
+    refit = subparsers.add_parser("refit", help="Learner loop: full refits vs forest updates")
+    refit.add_argument("--trees", type=int, default=100, help="Number of trees")
+    refit.add_argument(
+        "--fractions", type=float, nargs="+", default=[0.5, 0.2], help="Refit fractions"
+    )
+    refit.add_argument("--batch-size", type=int, default=10, help="Samples labeled per iteration")
+    refit.add_argument("--labeled", type=float, default=0.25, help="Initially labeled ratio")
+
+    adaptive = subparsers.add_parser("adaptive", help="Learner loop: fixed vs adaptive forest size")
+    adaptive.add_argument("--trees", type=int, default=100, help="Maximum number of trees")
+    adaptive.add_argument("--min-trees", type=int, default=25, help="Initial number of trees")
+    adaptive.add_argument(
+        "--batch-size", type=int, default=10, help="Samples labeled per iteration"
+    )
+    adaptive.add_argument("--labeled", type=float, default=0.25, help="Initially labeled ratio")
+
+    boosting = subparsers.add_parser(
+        "boosting", help="Fit and predict: forest vs gradient boosting vs sklearn"
+    )
+    boosting.add_argument("--trees", type=int, default=100, help="Forest trees")
+    boosting.add_argument("--iterations", type=int, default=100, help="Boosting rounds")
+
+    svm = subparsers.add_parser(
+        "svm", help="SVM fit: Pegasos batch sizes, dual CD and kernel feature maps"
+    )
+    svm.add_argument("--epochs", type=int, default=100, help="SVM iter_count")
+    svm.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[32, 256], help="Mini-batch sizes"
+    )
+    svm.add_argument("--tol", type=float, default=None, help="Early stopping tolerance")
+    svm.add_argument("--average", action="store_true", help="Polyak-average the iterates")
+
+    args = parser.parse_args()
+    return args
+
+
+def load_dataset(path: str, samples: int | None, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    df = pd.read_csv(path)  # pyright: ignore
+    x, y = df.iloc[:, :-1].to_numpy(), df.iloc[:, -1].to_numpy()
+
+    if samples is not None and samples < x.shape[0]:
+        indices = np.random.default_rng(seed).choice(x.shape[0], samples, replace=False)
+        x, y = x[indices], y[indices]
+
+    return x, y
+
+
+def measure(fn: Callable[[], Any], repeats: int) -> tuple[float, Any]:
+    best = np.inf
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def loop_split(dataset: np.ndarray) -> tuple[int, float] | None:
+    n_samples, n_features = dataset.shape[0], dataset.shape[1] - 1
+    labels = dataset[:, -1].astype(int)
+
+    initial_right = np.bincount(labels)
+    parent_impurity = gini_impurity(initial_right)
+
+    best_gain = -np.inf
+    best_split = None
+
+    for feature_index in range(n_features):
+        feature_column = dataset[:, feature_index]
+        sort_indices = np.argsort(feature_column)
+        features_sorted = feature_column[sort_indices]
+        labels_sorted = labels[sort_indices]
+
+        right_counts = np.copy(initial_right)
+        left_counts = np.zeros_like(right_counts)
+
+        for i in range(n_samples - 1):
+            right_counts[labels_sorted[i]] -= 1
+            left_counts[labels_sorted[i]] += 1
+
+            if features_sorted[i] == features_sorted[i + 1]:
+                continue
+
+            gain = (
+                parent_impurity
+                - (left_counts.sum() / n_samples) * gini_impurity(left_counts)
+                - (right_counts.sum() / n_samples) * gini_impurity(right_counts)
+            )
+
+            if gain > best_gain:
+                best_gain = gain
+                best_split = (feature_index, (features_sorted[i] + features_sorted[i + 1]) / 2)
+
+    return best_split
+
+
+def fit_root_split(X: np.ndarray, labels: np.ndarray) -> tuple[int, float] | None:
+    # a depth 1 tree only searches the root split, then partitions the samples once
+    tree = CART(CARTConfig(max_depth=1))
+    tree.fit(X, labels)
+
+    flat = tree.tree
+    if flat.feature[0] < 0:
+        return None
+
+    return int(flat.feature[0]), float(flat.threshold[0])
+
+
+def benchmark_split(X: np.ndarray, y: np.ndarray, repeats: int) -> None:
+    _, labels = np.unique(y, return_inverse=True)
+    dataset = np.concatenate((X, labels[:, np.newaxis]), axis=1)
+
+    loop_time, loop_result = measure(lambda: loop_split(dataset), 1)
+    vectorized_time, vectorized_result = measure(lambda: fit_root_split(X, labels), repeats)
+
+    if vectorized_result != loop_result:
+        raise RuntimeError(f"Split mismatch: {vectorized_result} != {loop_result}")
+
+    print(f"Root split search on {X.shape[0]} samples x {X.shape[1]} features")
+    print(f"  per-sample loop: {loop_time:.3f}s")
+    print(f"  vectorized:      {vectorized_time:.3f}s")
+    print(f"  speedup:         {loop_time / vectorized_time:.1f}x")
+
+
+def benchmark_histogram(
+    X: np.ndarray, y: np.ndarray, n_trees: int, bins: list[int], repeats: int, seed: int
+) -> None:
+    X_train, X_test, y_train, y_test = cast(
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        train_test_split(X, y, test_size=0.3, random_state=seed, stratify=y),
+    )
+
+    print(f"Forest of {n_trees} trees on {X_train.shape[0]} samples x {X_train.shape[1]} features")
+    for max_bins in [None, *bins]:
+        forest = RandomForest(RandomForestConfig(CARTConfig(max_bins=max_bins), n_trees=n_trees))
+
+        def fit(forest: RandomForest = forest) -> None:
+            forest.set_rng(seed)
+            forest.fit(X_train, y_train)
+
+        fit_time, _ = measure(fit, repeats)
+        auc = average_precision_score(y_test, forest.predict_proba(X_test)[:, 1])
+
+        name = "exact" if max_bins is None else f"{max_bins} bins"
+        print(f"  {name:<10} fit: {fit_time:.3f}s  PR AUC: {auc:.3f}")
+
+
+def benchmark_growth(
+    X: np.ndarray, y: np.ndarray, n_trees: int, leaves: list[int], repeats: int, seed: int
+) -> None:
+    X_train, X_test, y_train, y_test = cast(
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        train_test_split(X, y, test_size=0.3, random_state=seed, stratify=y),
+    )
+
+    print(f"Forest of {n_trees} trees on {X_train.shape[0]} samples x {X_train.shape[1]} features")
+    for max_leaf_nodes in [None, *leaves]:
+        tree_config = CARTConfig(max_leaf_nodes=max_leaf_nodes)
+        forest = RandomForest(RandomForestConfig(tree_config, n_trees=n_trees))
+
+        def fit(forest: RandomForest = forest) -> None:
+            forest.set_rng(seed)
+            forest.fit(X_train, y_train)
+
+        fit_time, _ = measure(fit, repeats)
+        auc = average_precision_score(y_test, forest.predict_proba(X_test)[:, 1])
+        nodes = np.mean(forest.node_counts)
+
+        name = "depth-first" if max_leaf_nodes is None else f"{max_leaf_nodes} leaves"
+        print(f"  {name:<12} fit: {fit_time:.3f}s  nodes/tree: {nodes:.1f}  PR AUC: {auc:.3f}")
+
+
+def benchmark_refit(
+    X: np.ndarray,
+    y: np.ndarray,
+    n_trees: int,
+    fractions: list[float],
+    batch_size: int,
+    labeled_ratio: float,
+    seed: int,
+) -> None:
+    X_train, X_test, y_train, y_test = cast(
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        train_test_split(X, y, test_size=0.3, random_state=seed, stratify=y),
+    )
+    rng = np.random.default_rng(seed)
+    initial = rng.choice(X_train.shape[0], int(labeled_ratio * X_train.shape[0]), replace=False)
+
+    print(f"Learner loop over {X_train.shape[0]} samples, {n_trees} trees, batch of {batch_size}")
+    for fraction in [1.0, *fractions]:
+        forest = RandomForest(RandomForestConfig(n_trees=n_trees, refit_fraction=fraction))
+        forest.set_rng(seed)
+
+        labeled_mask = np.zeros(X_train.shape[0], dtype=bool)
+        labeled_mask[initial] = True
+        learner = ActiveLearner(
+            ActiveLearnerConfig(classifier=forest, batch_size=batch_size, seed=seed),
+            LearningData(X_train, y_train, labeled_mask),
+        )
+
+        loop_time, _ = measure(lambda learner=learner: learner.loop(X_test, y_test), 1)
+        auc = np.mean([average_precision_score(y_test, proba) for proba in learner.results.proba])
+
+        name = "full refit" if fraction == 1 else f"update {fraction:g}"
+        print(f"  {name:<12} loop: {loop_time:.3f}s  mean PR AUC: {auc:.3f}")
+
+
+def benchmark_adaptive(
+    X: np.ndarray,
+    y: np.ndarray,
+    n_trees: int,
+    min_trees: int,
+    batch_size: int,
+    labeled_ratio: float,
+    seed: int,
+) -> None:
+    X_train, X_test, y_train, y_test = cast(
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        train_test_split(X, y, test_size=0.3, random_state=seed, stratify=y),
+    )
+    rng = np.random.default_rng(seed)
+    initial = rng.choice(X_train.shape[0], int(labeled_ratio * X_train.shape[0]), replace=False)
+
+    print(f"Learner loop over {X_train.shape[0]} samples, up to {n_trees} trees")
+    variants: dict[str, RandomForestConfig] = {
+        "fixed": RandomForestConfig(n_trees=n_trees),
+        "schedule": RandomForestConfig(n_trees=n_trees, min_trees=min_trees),
+        "stable": RandomForestConfig(n_trees=n_trees, min_trees=min_trees, growth="stable"),
+    }
+    for name, config in variants.items():
+        forest = RandomForest(config)
+        forest.set_rng(seed)
+
+        labeled_mask = np.zeros(X_train.shape[0], dtype=bool)
+        labeled_mask[initial] = True
+        learner = ActiveLearner(
+            ActiveLearnerConfig(classifier=forest, batch_size=batch_size, seed=seed),
+            LearningData(X_train, y_train, labeled_mask),
+        )
+
+        loop_time, _ = measure(lambda learner=learner: learner.loop(X_test, y_test), 1)
+        final_auc = average_precision_score(y_test, learner.results.proba[-1])
+        trees = [diagnostics["n_trees"] for diagnostics in learner.results.diagnostics]
+
+        print(
+            f"  {name:<9} loop: {loop_time:.3f}s  trees: {trees[0]:.0f} -> {trees[-1]:.0f}  "
+            f"final PR AUC: {final_auc:.3f}"
+        )
+
+
+def benchmark_boosting(
+    X: np.ndarray, y: np.ndarray, n_trees: int, max_iter: int, repeats: int, seed: int
+) -> None:
+    X_train, X_test, y_train, y_test = cast(
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        train_test_split(X, y, test_size=0.3, random_state=seed, stratify=y),
+    )
+    models: dict[str, Any] = {
+        "forest": RandomForest(RandomForestConfig(n_trees=n_trees)),
+        "boosting": GradientBoosting(GradientBoostingConfig(max_iter=max_iter)),
+        "sklearn": HistGradientBoostingClassifier(
+            max_iter=max_iter, early_stopping=True, random_state=seed
+        ),
+    }
+
+    print(f"Fit on {X_train.shape[0]} samples x {X_train.shape[1]} features")
+    for name, model in models.items():
+
+        def fit(model: Any = model) -> None:
+            if hasattr(model, "set_rng"):
+                model.set_rng(seed)
+            model.fit(X_train, y_train)
+
+        fit_time, _ = measure(fit, repeats)
+        predict_time, proba = measure(lambda model=model: model.predict_proba(X_test), repeats)
+        auc = average_precision_score(y_test, proba[:, 1])
+
+        print(
+            f"  {name:<9} fit: {fit_time:.3f}s  predict: {predict_time * 1000:.1f}ms  "
+            f"PR AUC: {auc:.3f}"
+        )
+
+
+def benchmark_svm(
+    X: np.ndarray,
+    y: np.ndarray,
+    epochs: int,
+    batch_sizes: list[int],
+    tol: float | None,
+    average: bool,
+    repeats: int,
+    seed: int,
+) -> None:
+    X_train, X_test, y_train, y_test = cast(
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        train_test_split(X, y, test_size=0.3, random_state=seed, stratify=y),
+    )
+
+    variants = {
+        "per-sample" if batch_size == 1 else f"batch {batch_size}": SVMConfig(
+            iter_count=epochs, batch_size=batch_size, tol=tol, average=average
+        )
+        for batch_size in [1, *batch_sizes]
+    }
+    variants["dual_cd"] = SVMConfig(iter_count=epochs, tol=tol, solver="dual_cd")
+    variants["fourier"] = SVMConfig(iter_count=epochs, tol=tol, feature_map="fourier")
+    variants["nystroem"] = SVMConfig(iter_count=epochs, tol=tol, feature_map="nystroem")
+
+    print(f"SVM, {epochs} epochs on {X_train.shape[0]} samples x {X_train.shape[1]} features")
+    for name, config in variants.items():
+        svm = SVM(config)
+
+        def fit(svm: SVM = svm) -> None:
+            svm.set_rng(seed)
+            svm.fit(X_train, y_train)
+
+        fit_time, _ = measure(fit, repeats)
+        auc = average_precision_score(y_test, svm.predict_proba(X_test)[:, 1])
+
+        print(f"  {name:<10} fit: {fit_time:.3f}s  epochs: {svm.n_epochs}  PR AUC: {auc:.3f}")
+
+
+def main() -> None:
+    args = get_args()
+    X, y = load_dataset(args.data, args.samples, args.seed)
+
+    match args.benchmark:
+        case "split":
+            benchmark_split(X, y, args.repeats)
+        case "histogram":
+            benchmark_histogram(X, y, args.trees, args.bins, args.repeats, args.seed)
+        case "growth":
+            benchmark_growth(X, y, args.trees, args.leaves, args.repeats, args.seed)
+        case "refit":
+            benchmark_refit(
+                X, y, args.trees, args.fractions, args.batch_size, args.labeled, args.seed
+            )
+        case "adaptive":
+            benchmark_adaptive(
+                X, y, args.trees, args.min_trees, args.batch_size, args.labeled, args.seed
+            )
+        case "boosting":
+            benchmark_boosting(X, y, args.trees, args.iterations, args.repeats, args.seed)
+        case "svm":
+            benchmark_svm(
+                X, y, args.epochs, args.batch_sizes, args.tol, args.average, args.repeats, args.seed
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,12 @@ import pandas as pd
 from ucimlrepo import fetch_ucirepo
 
 from src.config import ConfigParser
-from src.models.classifier import CLASSIFIERS
-from src.utils.aggregator import Aggregator, AggregatorConfig
+from src.utils.aggregator import SKLEARN_CLASSIFIERS, Aggregator, AggregatorConfig
 
 
 def get_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(prog="Results comparision")
-    parser.add_argument("classifier", choices=CLASSIFIERS)
+    parser.add_argument("classifier", choices=SKLEARN_CLASSIFIERS)
     args = parser.parse_args()
     return args
 
@@ -6,7 +6,7 @@ import pandas as pd
 
 TARGET_RATIOS = [0.25, 0.30, 0.50, 0.75, 1.00]
 
-MODEL_LABELS = {"forest": "RF", "svm": "SVM"}
+MODEL_LABELS = {"forest": "RF", "svm": "SVM", "mondrian": "MF", "boosting": "GBT"}
 
 INIT_LABELS = {"random": "rand", "cluster": "clus"}
 
@@ -0,0 +1,306 @@
+import heapq
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from scipy.special import expit
+
+from src.config import register_config
+from src.models.forest.binning import MAX_BINS, BinnedFeatures, bin_features
+from src.models.forest.cart import FlatTree, NodeArrays
+
+if TYPE_CHECKING:
+    from src.models.classifier import ClassifierName
+
+# hessian sum a child needs, keeps leaf values finite on nearly separated samples
+MIN_CHILD_HESSIAN = 1e-3
+
+
+@register_config(name="boosting")
+@dataclass
+class GradientBoostingConfig:
+    max_iter: int = 100  # boosting rounds, each adds one tree
+    learning_rate: float = 0.1
+    max_leaf_nodes: int = 31
+    max_depth: int | None = None
+    min_samples_leaf: int = 20
+    l2_regularization: float = 0.0
+    max_bins: int = 255
+    early_stopping: bool = True  # stop once the validation loss stops improving
+    validation_fraction: float = 0.1  # share of the training set held out for early stopping
+    n_iter_no_change: int = 10
+    tol: float = 1e-7
+
+
+@dataclass
+class _Validation:
+    """Held-out samples, their raw predictions and the loss after every round."""
+
+    X: np.ndarray
+    y: np.ndarray
+    raw: np.ndarray
+    losses: list[float]
+
+
+@dataclass
+class _GrowingNode:
+    samples: np.ndarray
+    depth: int
+    histogram: np.ndarray
+    parent: int = -1
+    is_left: bool = False
+    feature: int = -1
+    bin: int = -1
+    gain: float = 0.0
+
+
+class GradientBoosting:
+    """
+    Binary gradient-boosted trees on the log loss, grown on histograms of binned features.
+
+    Every tree is grown best-first up to `max_leaf_nodes` leaves from per-bin sums of
+    gradients and hessians; the larger child's histogram is its parent's minus its
+    sibling's. Trees are stored as `FlatTree`s with bin edges as thresholds, so prediction
+    runs on raw features without binning them.
+    """
+
+    name: "ClassifierName" = "boosting"
+
+    def __init__(self, config: GradientBoostingConfig | None = None) -> None:
+        if config is None:
+            config = GradientBoostingConfig()
+
+        if not 2 <= config.max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins must be between 2 and {MAX_BINS}, got {config.max_bins}")
+        if config.max_leaf_nodes < 2:
+            raise ValueError(f"max_leaf_nodes must be at least 2, got {config.max_leaf_nodes}")
+        if not 0 < config.validation_fraction < 1:
+            raise ValueError(
+                f"validation_fraction must be in (0, 1), got {config.validation_fraction}"
+            )
+
+        self._max_iter = config.max_iter
+        self._learning_rate = config.learning_rate
+        self._max_leaf_nodes = config.max_leaf_nodes
+        self._max_depth = config.max_depth
+        self._min_samples_leaf = config.min_samples_leaf
+        self._l2_regularization = config.l2_regularization
+        self._max_bins = config.max_bins
+        self._early_stopping = config.early_stopping
+        self._validation_fraction = config.validation_fraction
+        self._n_iter_no_change = config.n_iter_no_change
+        self._tol = config.tol
+        self._trees: list[FlatTree] = []
+        self._baseline = 0.0
+        self._rng = np.random.default_rng()
+        self.classes = np.empty(0)
+
+    def set_rng(self, seed: int) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def n_iter(self) -> int:
+        return len(self._trees)
+
+    def diagnostics(self) -> dict[str, float]:
+        return {"n_iter": float(self.n_iter)}
+
+    def fit(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        self.classes, labels = np.unique(y_train, return_inverse=True)
+        if self.classes.size > 2:
+            raise ValueError(f"Only binary labels are supported, got {self.classes.size} classes")
+
+        self._trees = []
+        y = labels.astype(np.float64)
+        positive = np.clip(y.mean(), 1e-15, 1 - 1e-15)
+        self._baseline = float(np.log(positive / (1 - positive)))
+        if self.classes.size < 2:
+            return
+
+        held_out = self._validation_split(labels) if self._early_stopping else None
+        validation = None
+        if held_out is not None:
+            training = np.setdiff1d(np.arange(y.size), held_out)
+            raw_validation = np.full(held_out.size, self._baseline)
+            validation = _Validation(X_train[held_out], y[held_out], raw_validation, [])
+            validation.losses.append(_log_loss(validation.y, validation.raw))
+            X_train, y = X_train[training], y[training]
+
+        binned = bin_features(X_train, self._max_bins)
+        raw = np.full(y.size, self._baseline)
+
+        for _ in range(self._max_iter):
+            proba = expit(raw)
+            tree, update = self._grow_tree(binned, proba - y, proba * (1 - proba))
+            self._trees.append(tree)
+            raw += update
+
+            if validation is not None:
+                validation.raw += _tree_values(tree, validation.X)
+                validation.losses.append(_log_loss(validation.y, validation.raw))
+                if self._should_stop(validation.losses):
+                    break
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.classes.size == 0:
+            raise ValueError("The model has not been fitted yet")
+        if self.classes.size == 1:
+            return np.ones((X.shape[0], 1))
+
+        positive = expit(self.decision_function(X))
+        return np.column_stack((1 - positive, positive))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Log odds of the second class."""
+        raw = np.full(X.shape[0], self._baseline)
+        for tree in self._trees:
+            raw += _tree_values(tree, X)
+
+        return raw
+
+    def _validation_split(self, labels: np.ndarray) -> np.ndarray | None:
+        # stratified, so the rare class is represented on both sides
+        validation = [
+            self._rng.permutation(members)[: int(self._validation_fraction * members.size)]
+            for members in (np.flatnonzero(labels == label) for label in range(2))
+        ]
+        if any(members.size == 0 for members in validation):
+            return None
+
+        return np.sort(np.concatenate(validation))
+
+    def _should_stop(self, losses: list[float]) -> bool:
+        if len(losses) <= self._n_iter_no_change:
+            return False
+
+        reference = losses[-self._n_iter_no_change - 1]
+        return all(loss > reference - self._tol for loss in losses[-self._n_iter_no_change :])
+
+    def _grow_tree(
+        self, binned: BinnedFeatures, gradients: np.ndarray, hessians: np.ndarray
+    ) -> tuple[FlatTree, np.ndarray]:
+        """Tree fitted to one Newton step and the shrunk leaf value of every sample."""
+        builder = NodeArrays()
+        update = np.empty(gradients.size)
+
+        def add_leaf(node: _GrowingNode) -> None:
+            gradient, hessian = node.histogram[:2, 0].sum(axis=1)
+            value = -self._learning_rate * gradient / (hessian + self._l2_regularization + 1e-15)
+            builder.add_leaf(node.parent, node.is_left, np.array([value]))
+            update[node.samples] = value
+
+        samples = np.arange(gradients.size)
+        root = _GrowingNode(samples, 0, _histogram(binned, gradients, hessians, samples))
+
+        pending: list[tuple[float, int, _GrowingNode]] = []
+        n_pushed = 0
+        if self._evaluate_node(root):
+            pending.append((-root.gain, n_pushed, root))
+            n_pushed += 1
+        else:
+            add_leaf(root)
+
+        n_leaves = 1
+        while pending and n_leaves < self._max_leaf_nodes:
+            _, _, node = heapq.heappop(pending)
+            node_id = builder.add_split(
+                node.parent, node.is_left, node.feature, float(binned.edges[node.feature, node.bin])
+            )
+            n_leaves += 1
+
+            goes_left = binned.codes[node.samples, node.feature] <= node.bin
+            left = _GrowingNode(
+                node.samples[goes_left], node.depth + 1, node.histogram, node_id, True
+            )
+            right = _GrowingNode(node.samples[~goes_left], node.depth + 1, node.histogram, node_id)
+
+            small, large = (
+                (left, right) if left.samples.size <= right.samples.size else (right, left)
+            )
+            small.histogram = _histogram(binned, gradients, hessians, small.samples)
+            large.histogram = node.histogram - small.histogram
+
+            for child in (left, right):
+                if self._evaluate_node(child):
+                    heapq.heappush(pending, (-child.gain, n_pushed, child))
+                    n_pushed += 1
+                else:
+                    add_leaf(child)
+
+        for _, _, node in pending:
+            add_leaf(node)
+
+        return builder.build(), update
+
+    def _evaluate_node(self, node: _GrowingNode) -> bool:
+        """Find the split of `node` with the largest loss reduction, False if none is valid."""
+        if self._max_depth is not None and node.depth >= self._max_depth:
+            return False
+        if node.samples.size < 2 * self._min_samples_leaf:
+            return False
+
+        # only boundaries right after an occupied bin that leave min_samples_leaf samples on
+        # both sides are candidates, gradient sums are only accumulated for their features
+        gradient, hessian, count = node.histogram
+        n_samples = node.samples.size
+        left_count = np.cumsum(count[:, :-1], axis=1)
+        candidates = (
+            (count[:, :-1] > 0)
+            & (left_count >= self._min_samples_leaf)
+            & (left_count <= n_samples - self._min_samples_leaf)
+        )
+        features = np.flatnonzero(candidates.any(axis=1))
+        if features.size == 0:
+            return False
+
+        rows, bins = np.nonzero(candidates[features])
+        left_gradient = np.cumsum(gradient[features, :-1], axis=1)[rows, bins]
+        left_hessian = np.cumsum(hessian[features, :-1], axis=1)[rows, bins]
+        total_gradient, total_hessian = gradient[0].sum(), hessian[0].sum()
+        right_gradient = total_gradient - left_gradient
+        right_hessian = total_hessian - left_hessian
+
+        l2 = self._l2_regularization
+        valid = (left_hessian >= MIN_CHILD_HESSIAN) & (right_hessian >= MIN_CHILD_HESSIAN)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gains = (
+                left_gradient**2 / (left_hessian + l2)
+                + right_gradient**2 / (right_hessian + l2)
+                - total_gradient**2 / (total_hessian + l2)
+            )
+        gains = np.where(valid, gains, -np.inf)
+
+        best = int(np.argmax(gains))
+        if not gains[best] > 0:
+            return False
+
+        node.feature, node.bin = int(features[rows[best]]), int(bins[best])
+        node.gain = float(gains[best])
+        return True
+
+
+def _histogram(
+    binned: BinnedFeatures, gradients: np.ndarray, hessians: np.ndarray, samples: np.ndarray
+) -> np.ndarray:
+    """Gradient, hessian and sample sums per feature and bin, (3, n_features, n_bins)."""
+    n_features, n_bins = int(binned.codes.shape[1]), binned.n_bins
+    flat = (binned.codes[samples] + np.arange(n_features) * n_bins).ravel()
+    size = n_features * n_bins
+
+    histogram = np.empty((3, size))
+    histogram[0] = np.bincount(flat, np.repeat(gradients[samples], n_features), minlength=size)
+    histogram[1] = np.bincount(flat, np.repeat(hessians[samples], n_features), minlength=size)
+    histogram[2] = np.bincount(flat, minlength=size)
+
+    return histogram.reshape(3, n_features, n_bins)
+
+
+def _tree_values(tree: FlatTree, X: np.ndarray) -> np.ndarray:
+    return tree.proba[tree.value[tree.apply(X)], 0]
+
+
+def _log_loss(y: np.ndarray, raw: np.ndarray) -> float:
+    return float(np.mean(np.logaddexp(0, raw) - y * raw))
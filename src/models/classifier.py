@@ -1,14 +1,16 @@
-from typing import Literal, Protocol
+from typing import Literal, Protocol, runtime_checkable
 
 import numpy as np
 
 from src.config import ConfigParser
 
+from .boosting.boosting import GradientBoosting, GradientBoostingConfig
 from .forest.forest import RandomForest, RandomForestConfig
+from .mondrian.mondrian import MondrianForest, MondrianForestConfig
 from .svm.svm import SVM, SVMConfig
 
-type ClassifierName = Literal["svm", "forest"]
-CLASSIFIERS = ["svm", "forest"]
+type ClassifierName = Literal["svm", "forest", "mondrian", "boosting"]
+CLASSIFIERS = ["svm", "forest", "mondrian", "boosting"]
 
 
 class Classifier(Protocol):
@@ -20,6 +22,26 @@ class Classifier(Protocol):
     def set_rng(self, seed: int) -> None: ...
 
 
+@runtime_checkable
+class DiagnosedClassifier(Classifier, Protocol):
+    def diagnostics(self) -> dict[str, float]: ...
+
+
+@runtime_checkable
+class IncrementalClassifier(Classifier, Protocol):
+    # False if update() only refits on all samples, in labeling order rather than fit()'s
+    @property
+    def incremental(self) -> bool: ...
+
+    def update(self, X_new: np.ndarray, y_new: np.ndarray) -> None: ...
+
+
+@runtime_checkable
+class CachingClassifier(Classifier, Protocol):
+    def register(self, X: np.ndarray) -> None: ...
+    def is_registered(self, X: np.ndarray) -> bool: ...
+
+
 def resolve_classifier(name: ClassifierName, p: ConfigParser) -> Classifier:
     match name:
         case "svm":
@@ -27,3 +49,9 @@ def resolve_classifier(name: ClassifierName, p: ConfigParser) -> Classifier:
 
         case "forest":
             return RandomForest(p.get(RandomForestConfig))
+
+        case "mondrian":
+            return MondrianForest(p.get(MondrianForestConfig))
+
+        case "boosting":
+            return GradientBoosting(p.get(GradientBoostingConfig))
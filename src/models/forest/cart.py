@@ -1,11 +1,16 @@
-from dataclasses import dataclass
+import heapq
+import math
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Literal
 
 import numpy as np
+import numpy.typing as npt
 
-from src.config import register_config
-from src.models.forest.util import gini_impurity
+from src.config import ConfigParser, register_config
 
-from .util import highest_probability_arg
+from .binning import MAX_BINS, BinnedFeatures, bin_features
+from .util import class_totals, split_gains
 
 
 @dataclass
@@ -21,114 +26,645 @@ class Leaf:
     probabilities: np.ndarray
 
 
-@register_config(name="CART")
 @dataclass
-class CARTConfig:
-    max_depth: int = 10
-    min_samples_split: int = 2
+class FlatTree:
+    """
+    Tree compiled into parallel node arrays, leaves are marked with feature == -1.
+
+    Attributes:
+        feature: Split feature of each node
+        threshold: Split threshold of each node, samples with value >= threshold go right
+        left: Left child of each node
+        right: Right child of each node
+        value: Row of `proba` holding leaf probabilities, -1 for decision nodes
+        proba: Probabilities of all leaves as one contiguous (n_leaves, n_labels) array
+    """
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    proba: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return self.feature.shape[0]
+
+    def to_nodes(self) -> DecisionNode | Leaf:
+        nodes: dict[int, DecisionNode | Leaf] = {}
+
+        # children are resolved before their parents, so deep trees do not recurse
+        for node_id in reversed(range(self.node_count)):
+            if self.feature[node_id] < 0:
+                nodes[node_id] = Leaf(self.proba[self.value[node_id]])
+            else:
+                nodes[node_id] = DecisionNode(
+                    int(self.feature[node_id]),
+                    float(self.threshold[node_id]),
+                    nodes.pop(int(self.left[node_id])),
+                    nodes.pop(int(self.right[node_id])),
+                )
 
+        return nodes[0]
 
-class CART:
-    def __init__(self, config: CARTConfig) -> None:
-        self._root: DecisionNode | Leaf | None = None
-        self._max_depth = config.max_depth
-        self._min_samples_split = config.min_samples_split
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        n_samples = int(X.shape[0])
+        nodes = np.zeros(n_samples, dtype=np.intp)
+        active: npt.NDArray[np.intp] = (
+            np.arange(n_samples) if self.feature[0] >= 0 else np.empty(0, dtype=np.intp)
+        )
 
-    def fit(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
-        if self._root is not None:
-            self._root = None
+        # every pass moves all samples that are still at a decision node one level down
+        while active.size > 0:
+            current = nodes[active]
+            go_right = X[active, self.feature[current]] >= self.threshold[current]
+            nodes[active] = np.where(go_right, self.right[current], self.left[current])
+            active = active[self.feature[nodes[active]] >= 0]
 
-        dataset = np.concatenate((X_train, y_train[:, np.newaxis]), axis=1)
-        self.classes = np.unique(y_train)
-        self._root = self._build_tree(dataset, np.unique(y_train).size)
+        return nodes
 
-    def predict(self, X: np.ndarray) -> np.ndarray:
-        if self._root is None:
-            raise ValueError("The root is not initialized, call fit() first.")
 
-        return np.array([self._pl(self._root, sample) for sample in X])
+@dataclass
+class NodeArrays:
+    """Nodes of a tree being grown, appended in node id order and compiled by `build`."""
 
-    def predict_proba(self, X: np.ndarray) -> np.ndarray:
-        if self._root is None:
-            raise ValueError("The root is not initialized, call fit() first.")
+    feature: list[int] = field(default_factory=list[int])
+    threshold: list[float] = field(default_factory=list[float])
+    left: list[int] = field(default_factory=list[int])
+    right: list[int] = field(default_factory=list[int])
+    value: list[int] = field(default_factory=list[int])
+    proba: list[np.ndarray] = field(default_factory=list[np.ndarray])
 
-        return np.array([self._pp(self._root, sample) for sample in X])
+    def add_split(self, parent: int, is_left: bool, feature: int, threshold: float) -> int:
+        node_id = self._add_node(parent, is_left)
+        self.feature.append(feature)
+        self.threshold.append(threshold)
+        self.value.append(-1)
 
-    def _pl(self, node: DecisionNode | Leaf, sample: np.ndarray) -> int:
-        if isinstance(node, Leaf):
-            return highest_probability_arg(node.probabilities)
-        child = node.right if sample[node.feature_index] >= node.threshold else node.left
+        return node_id
 
-        return self._pl(child, sample)
+    def add_leaf(self, parent: int, is_left: bool, probabilities: np.ndarray) -> int:
+        node_id = self._add_node(parent, is_left)
+        self.feature.append(-1)
+        self.threshold.append(np.nan)
+        self.value.append(len(self.proba))
+        self.proba.append(probabilities)
 
-    def _pp(self, node: DecisionNode | Leaf, sample: np.ndarray) -> np.ndarray:
-        if isinstance(node, Leaf):
-            return node.probabilities
-        child = node.right if sample[node.feature_index] >= node.threshold else node.left
+        return node_id
 
-        return self._pp(child, sample)
+    def build(self) -> FlatTree:
+        return FlatTree(
+            feature=np.array(self.feature, dtype=np.intp),
+            threshold=np.array(self.threshold, dtype=np.float64),
+            left=np.array(self.left, dtype=np.intp),
+            right=np.array(self.right, dtype=np.intp),
+            value=np.array(self.value, dtype=np.intp),
+            proba=np.stack(self.proba),
+        )
 
-    def _build_tree(
-        self, dataset: np.ndarray, n_labels: int, current_depth: int = 0
-    ) -> DecisionNode | Leaf:
-        n_samples = dataset.shape[0]
-        dataset_labels = dataset[:, -1]
+    def _add_node(self, parent: int, is_left: bool) -> int:
+        node_id = len(self.feature)
+        if parent >= 0:
+            (self.left if is_left else self.right)[parent] = node_id
 
-        split = self._find_best_split(dataset)
-        if split is None or n_samples < self._min_samples_split or current_depth >= self._max_depth:
-            proba = np.zeros(n_labels)
-            unique, counts = np.unique(dataset_labels, return_counts=True)
-            proba[unique.astype(int)] = counts / np.sum(counts)
-            return Leaf(proba)
+        self.left.append(-1)
+        self.right.append(-1)
 
-        feature, threshold, left_mask, right_mask = split
+        return node_id
 
-        left_subtree = self._build_tree(dataset[left_mask], n_labels, current_depth + 1)
-        right_subtree = self._build_tree(dataset[right_mask], n_labels, current_depth + 1)
 
-        return DecisionNode(feature, threshold, left_subtree, right_subtree)
+def _is_constant(X: np.ndarray, samples: np.ndarray, features: np.ndarray) -> np.ndarray:
+    values = X[samples[:, np.newaxis], features]
+    return values.min(axis=0) == values.max(axis=0)
 
-    def _find_best_split(
-        self, dataset: np.ndarray
-    ) -> tuple[int, float, np.ndarray, np.ndarray] | None:
-        n_samples, n_features = dataset.shape[0], dataset.shape[1] - 1
-        labels = dataset[:, -1].astype(int)
 
-        initial_right = np.bincount(labels)
-        parent_impurity = gini_impurity(initial_right)
+@dataclass
+class _PendingNode:
+    start: int
+    end: int
+    depth: int
+    parent: int = -1
+    is_left: bool = False
+    histogram: np.ndarray | None = None
+    # set once the node is evaluated: split feature and threshold, the side every node
+    # sample goes to and the impurity decrease weighted by the node share of the tree
+    feature: int = -1
+    threshold: float = np.nan
+    goes_left: np.ndarray | None = None
+    gain: float = 0.0
 
-        best_gain = -np.inf
-        best_split = None
 
-        for feature_index in range(n_features):
-            feature_column = dataset[:, feature_index]
+@dataclass
+class _TrainingData:
+    X: np.ndarray
+    labels: np.ndarray
+    weights: np.ndarray
+    features: np.ndarray
+    n_labels: int
+    binned: BinnedFeatures | None
 
-            sort_indices = np.argsort(feature_column)
-            features_sorted = feature_column[sort_indices]
-            labels_sorted = labels[sort_indices]
 
-            right_counts = np.copy(initial_right)
-            left_counts = np.zeros_like(right_counts)
+def _uses_histogram(binned: BinnedFeatures, node: _PendingNode) -> bool:
+    # a histogram costs a pass over every bin of every feature, smaller nodes sort their codes
+    return node.end - node.start >= binned.n_bins
 
-            for i in range(n_samples - 1):
-                label = labels_sorted[i]
-                right_counts[label] -= 1
-                left_counts[label] += 1
 
-                if features_sorted[i] == features_sorted[i + 1]:
-                    continue
+def _best_sorted_split(
+    data: _TrainingData, values_sorted: np.ndarray, sort_indices: np.ndarray
+) -> tuple[int, int] | None:
+    """Feature index and position of the best split between sorted rows, None if all tie."""
+    labels_sorted = data.labels[sort_indices]
+    weights_sorted = data.weights[sort_indices]
+
+    # counts[i, f] holds class counts of the i + 1 smallest samples of feature f
+    one_hot = labels_sorted[:, :, np.newaxis] == np.arange(data.n_labels)
+    counts = np.cumsum(one_hot * weights_sorted[:, :, np.newaxis], axis=0)
+    parent_counts, left_counts = counts[-1, 0], counts[:-1]
+
+    gains = split_gains(left_counts, parent_counts)
+    gains[values_sorted[:-1] == values_sorted[1:]] = -np.inf
+
+    # feature-major argmax keeps the first best split in (feature, threshold) order
+    best = int(np.argmax(gains.T))
+    feature_index, position = divmod(best, values_sorted.shape[0] - 1)
+    if gains[position, feature_index] == -np.inf:
+        return None
+
+    return feature_index, position
+
+
+type MaxFeatures = int | float | Literal["sqrt", "log2"]
 
-                gain = (
-                    parent_impurity
-                    - (left_counts.sum() / n_samples) * gini_impurity(left_counts)
-                    - (right_counts.sum() / n_samples) * gini_impurity(right_counts)
-                )
 
-                if gain > best_gain:
-                    best_gain = gain
-                    thr = (features_sorted[i] + features_sorted[i + 1]) / 2
-                    left_mask = feature_column < thr
-                    right_mask = feature_column >= thr
-                    best_split = (feature_index, thr, left_mask, right_mask)
+def resolve_max_features(max_features: MaxFeatures | None, n_features: int) -> int:
+    """Number of features evaluated per node out of `n_features`, all of them if None."""
+    match max_features:
+        case None:
+            return n_features
+        case "sqrt":
+            return max(1, int(np.sqrt(n_features)))
+        case "log2":
+            return max(1, int(np.log2(n_features)))
+        case int() if max_features >= 1:
+            return min(max_features, n_features)
+        case float() if 0 < max_features <= 1:
+            return max(1, int(max_features * n_features))
+        case _:
+            raise ValueError(
+                f"max_features must be a positive int, a fraction in (0, 1], 'sqrt' or 'log2', "
+                f"got {max_features!r}"
+            )
 
-        return best_split
+
+def parse_max_features(value: MaxFeatures | None, _: ConfigParser) -> MaxFeatures | None:
+    resolve_max_features(value, 1)
+    return value
+
+
+@register_config(name="CART", field_parsers={"max_features": parse_max_features})
+@dataclass
+class CARTConfig:
+    max_depth: int = 10
+    min_samples_split: int = 2
+    max_leaf_nodes: int | None = None  # grows best-first up to this many leaves if set
+    min_impurity_decrease: float = 0.0  # weighted Gini decrease a split must reach
+    max_bins: int | None = None  # histogram splitter on pre-binned features, exact if None
+    splitter: Literal["best", "random"] = "best"  # random draws one threshold per feature
+    max_features: MaxFeatures | None = None  # features drawn at every node, all if None
+
+
+class CART:
+    def __init__(self, config: CARTConfig, rng: np.random.Generator | None = None) -> None:
+        if config.max_bins is not None and not 2 <= config.max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins must be between 2 and {MAX_BINS}, got {config.max_bins}")
+        if config.max_bins is not None and config.splitter == "random":
+            raise ValueError("The random splitter does not use binned features, unset max_bins")
+        resolve_max_features(config.max_features, 1)
+        if config.max_leaf_nodes is not None and config.max_leaf_nodes < 2:
+            raise ValueError(f"max_leaf_nodes must be at least 2, got {config.max_leaf_nodes}")
+
+        self._tree: FlatTree | None = None
+        self._max_depth = config.max_depth
+        self._min_samples_split = config.min_samples_split
+        self._max_leaf_nodes = config.max_leaf_nodes
+        self._min_impurity_decrease = config.min_impurity_decrease
+        self._max_bins = config.max_bins
+        self._splitter = config.splitter
+        self._max_features: MaxFeatures | None = config.max_features
+        self._n_node_features = 0
+        self._rng = rng if rng is not None else np.random.default_rng()
+
+    @classmethod
+    def from_tree(cls, config: CARTConfig, tree: FlatTree, classes: np.ndarray) -> "CART":
+        """Wrap an already built tree, e.g. loaded from disk, whose leaves cover `classes`."""
+        cart = cls(config)
+        cart._tree = tree
+        cart.classes = classes
+
+        return cart
+
+    @property
+    def tree(self) -> FlatTree:
+        if self._tree is None:
+            raise ValueError("The tree is not initialized, call fit() first.")
+
+        return self._tree
+
+    @property
+    def node_count(self) -> int:
+        return self.tree.node_count
+
+    @property
+    def root(self) -> DecisionNode | Leaf:
+        return self.tree.to_nodes()
+
+    def fit(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        sample_weight: np.ndarray | None = None,
+        features: np.ndarray | None = None,
+        binned: BinnedFeatures | None = None,
+        presorted: np.ndarray | None = None,
+    ) -> None:
+        """
+        Args:
+            X_train: Training samples, read in place and never copied
+            y_train: Training labels
+            sample_weight: Integer multiplicity of every sample, e.g. bootstrap counts;
+                samples with zero weight are left out
+            features: Columns of X_train the tree may split on, all if None
+            binned: X_train already quantized, used by the histogram splitter instead of
+                binning X_train again
+            presorted: (len(features), n_samples) sample indices of X_train sorted by each
+                of `features`, used by the exact splitter instead of sorting X_train again
+        """
+        self._tree = None
+        self.classes, labels = np.unique(y_train, return_inverse=True)
+
+        n_samples, n_features = X_train.shape
+        if sample_weight is None:
+            sample_weight = np.ones(n_samples, dtype=np.int64)
+        if features is None:
+            features = np.arange(n_features, dtype=np.intp)
+
+        self._n_node_features = resolve_max_features(self._max_features, len(features))
+
+        if self._splitter == "random":
+            binned = None
+            presorted = None
+        elif self._max_bins is None:
+            binned = None
+            # sampling features per node sorts the drawn ones, sorted orders of all features
+            # would cost more to partition than they save
+            if self._max_features is not None:
+                presorted = None
+            elif presorted is None:
+                presorted = np.argsort(X_train[:, features].T, axis=1, kind="stable")
+        elif binned is None:
+            binned = bin_features(X_train, self._max_bins, np.unique(features))
+
+        data = _TrainingData(
+            X_train,
+            labels.astype(np.intp),
+            np.asarray(sample_weight, dtype=np.int64),
+            np.asarray(features, dtype=np.intp),
+            self.classes.size,
+            binned,
+        )
+        self._tree = self._build_tree(data, presorted)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Row of `tree.proba` holding the leaf probabilities of every sample."""
+        tree = self.tree
+
+        return tree.value[tree.apply(X)]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        tree = self.tree
+
+        return self.classes[np.argmax(tree.proba, axis=1)[tree.value[tree.apply(X)]]]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        tree = self.tree
+
+        return tree.proba[tree.value[tree.apply(X)]]
+
+    def _build_tree(self, data: _TrainingData, presorted: np.ndarray | None) -> FlatTree:
+        builder = NodeArrays()
+        drawn = data.weights > 0
+
+        # every node owns the columns [start:end] of `order`, which are partitioned in place
+        # between its children, so building never copies more than the node being split;
+        # the exact splitter keeps one row of node samples sorted by each feature, a stable
+        # partition keeps them sorted, so no node below the root sorts again
+        if data.binned is None and presorted is not None:
+            order = presorted[drawn[presorted]].reshape(presorted.shape[0], -1)
+        else:
+            order = np.flatnonzero(drawn)[np.newaxis, :]
+        goes_left = np.zeros(drawn.size, dtype=bool)
+
+        root = _PendingNode(0, order.shape[1], 0)
+        if data.binned is not None and _uses_histogram(data.binned, root):
+            root.histogram = self._histogram(data, order[0])
+
+        # depth-first growth pops the latest pushed node and evaluates nodes as they are
+        # popped, best-first growth evaluates them when pushed and pops the largest gain
+        best_first = self._max_leaf_nodes is not None
+        leaf_budget = self._max_leaf_nodes or math.inf
+        pending: list[tuple[float, int, _PendingNode]] = []
+        n_pushed = 0
+        n_leaves = 1
+
+        def push(node: _PendingNode) -> None:
+            nonlocal n_pushed
+            if best_first:
+                self._evaluate_node(data, order, node)
+            heapq.heappush(pending, (-node.gain if best_first else -n_pushed, n_pushed, node))
+            n_pushed += 1
+
+        push(root)
+        while pending:
+            _, _, node = heapq.heappop(pending)
+            if not best_first:
+                self._evaluate_node(data, order, node)
+
+            node_order = order[:, node.start : node.end]
+            node_samples = node_order[0]
+
+            if node.goes_left is None or n_leaves >= leaf_budget:
+                node_labels = data.labels[node_samples]
+                node_weights = data.weights[node_samples]
+                counts = np.bincount(node_labels, node_weights, minlength=data.n_labels)
+                builder.add_leaf(node.parent, node.is_left, counts / np.sum(counts))
+                continue
+
+            node_id = builder.add_split(node.parent, node.is_left, node.feature, node.threshold)
+            n_leaves += 1
+
+            n_rows = order.shape[0]
+            n_left = int(np.count_nonzero(node.goes_left))
+            goes_left[node_samples] = node.goes_left
+            in_left = goes_left[node_order]
+            order[:, node.start : node.end] = np.concatenate(
+                (
+                    node_order[in_left].reshape(n_rows, n_left),
+                    node_order[~in_left].reshape(n_rows, node_samples.size - n_left),
+                ),
+                axis=1,
+            )
+
+            middle = node.start + n_left
+            left = _PendingNode(node.start, middle, node.depth + 1, node_id, True)
+            right = _PendingNode(middle, node.end, node.depth + 1, node_id, False)
+            if node.histogram is not None:
+                self._split_histogram(data, node.histogram, left, right, order[0])
+
+            push(right)
+            push(left)
+
+        return builder.build()
+
+    def _evaluate_node(self, data: _TrainingData, order: np.ndarray, node: _PendingNode) -> None:
+        node_order = order[:, node.start : node.end]
+        node_samples = node_order[0]
+        node_weights = data.weights[node_samples]
+
+        if np.sum(node_weights) < self._min_samples_split or node.depth >= self._max_depth:
+            return
+
+        if self._splitter == "random":
+            split = self._find_random_split(data, node_samples)
+        elif data.binned is None:
+            split = self._find_best_split(data, node_order)
+        elif node.histogram is None:
+            split = self._find_best_code_split(data, node_samples)
+        else:
+            split = self._find_best_histogram_split(node.histogram)
+
+        if split is None:
+            return
+
+        split_index, split_point = split
+        feature = int(data.features[split_index])
+        if data.binned is None:
+            threshold = split_point
+            goes_left = data.X[node_samples, feature] < threshold
+        else:
+            threshold = float(data.binned.edges[feature, int(split_point)])
+            goes_left = data.binned.codes[node_samples, feature] <= split_point
+
+        if self._max_leaf_nodes is not None or self._min_impurity_decrease > 0:
+            node_labels = data.labels[node_samples]
+            left_counts = np.bincount(
+                node_labels[goes_left], node_weights[goes_left], minlength=data.n_labels
+            )
+            parent_counts = np.bincount(node_labels, node_weights, minlength=data.n_labels)
+            share = np.sum(node_weights) / np.sum(data.weights)
+            node.gain = float(share * split_gains(left_counts, parent_counts))
+
+            if node.gain < self._min_impurity_decrease:
+                return
+
+        node.feature = feature
+        node.threshold = threshold
+        node.goes_left = goes_left
+
+    def _find_best_split(
+        self, data: _TrainingData, node_order: np.ndarray
+    ) -> tuple[int, float] | None:
+        n_samples = node_order.shape[1]
+        if n_samples < 2:
+            return None
+
+        features = data.features
+        candidates = None
+        if self._max_features is not None:
+            # only the drawn features are sorted, node_order holds the node samples unsorted
+            samples = node_order[0]
+            candidates = self._draw_features(
+                features.size, lambda drawn: _is_constant(data.X, samples, features[drawn])
+            )
+            if candidates.size == 0:
+                return None
+
+            features = features[candidates]
+            values = data.X[samples[:, np.newaxis], features]
+            node_order = samples[np.argsort(values, axis=0, kind="stable")].T
+
+        # node_order[f] lists the node samples sorted by feature f
+        sort_indices = node_order.T
+        features_sorted = data.X[sort_indices, features]
+        split = _best_sorted_split(data, features_sorted, sort_indices)
+        if split is None:
+            return None
+
+        feature_index, position = split
+        low, high = features_sorted[position : position + 2, feature_index]
+        thr = (low + high) / 2
+
+        if candidates is not None:
+            feature_index = candidates[feature_index]
+
+        return int(feature_index), float(thr)
+
+    def _find_best_code_split(
+        self, data: _TrainingData, samples: np.ndarray
+    ) -> tuple[int, int] | None:
+        if data.binned is None:
+            raise ValueError("Code splits need binned features")
+
+        # nodes too small for a histogram sort their bin codes instead, which yields the
+        # same candidate splits, gains and tie order as the histogram of the node would
+        codes = data.binned.codes[np.ix_(samples, data.features)]
+        candidates = None
+        if self._max_features is not None:
+            candidates = self._draw_features(
+                codes.shape[1], lambda drawn: np.all(codes[:, drawn] == codes[0, drawn], axis=0)
+            )
+            codes = codes[:, candidates]
+
+        if samples.size < 2 or codes.shape[1] == 0:
+            return None
+
+        order = np.argsort(codes, axis=0, kind="stable")
+        codes_sorted = np.take_along_axis(codes, order, axis=0)
+        split = _best_sorted_split(data, codes_sorted, samples[order])
+        if split is None:
+            return None
+
+        feature_index, position = split
+        split_bin = int(codes_sorted[position, feature_index])
+        if candidates is not None:
+            feature_index = candidates[feature_index]
+
+        return int(feature_index), split_bin
+
+    def _find_random_split(
+        self, data: _TrainingData, samples: np.ndarray
+    ) -> tuple[int, float] | None:
+        if samples.size < 2:
+            return None
+
+        features = data.features
+        candidates = None
+        if self._max_features is not None:
+            candidates = self._draw_features(
+                features.size, lambda drawn: _is_constant(data.X, samples, features[drawn])
+            )
+            features = features[candidates]
+
+        values = data.X[samples[:, np.newaxis], features]
+        low, high = values.min(axis=0), values.max(axis=0)
+
+        # one uniform threshold per feature, constant features are masked out below
+        thresholds = self._rng.uniform(low, high)
+        goes_left = values < thresholds
+
+        one_hot = data.labels[samples, np.newaxis] == np.arange(data.n_labels)
+        weighted = one_hot * data.weights[samples, np.newaxis]
+        left_counts = goes_left.T.astype(np.int64) @ weighted
+        parent_counts = weighted.sum(axis=0)
+
+        gains = split_gains(left_counts, parent_counts)
+        n_left = class_totals(left_counts)
+        gains[(low == high) | (n_left == 0) | (n_left == parent_counts.sum())] = -np.inf
+
+        if gains.size == 0 or np.max(gains) == -np.inf:
+            return None
+
+        feature_index = int(np.argmax(gains))
+        threshold = float(thresholds[feature_index])
+        if candidates is not None:
+            feature_index = int(candidates[feature_index])
+
+        return feature_index, threshold
+
+    def _draw_features(
+        self, n_features: int, is_constant: Callable[[np.ndarray], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Draw the features a node evaluates, as sorted indices into the tree features.
+
+        Features are visited in random order until `max_features` of them vary within the
+        node; constant ones are skipped without counting, as they cannot split anyway. The
+        scan stops there, so most nodes check no more than `max_features` features.
+        """
+        visited = self._rng.permutation(n_features)
+        drawn: list[np.ndarray] = []
+        n_drawn = 0
+        start = 0
+        while n_drawn < self._n_node_features and start < n_features:
+            batch = visited[start : start + self._n_node_features - n_drawn]
+            start += batch.size
+
+            varying = batch[~is_constant(batch)]
+            drawn.append(varying)
+            n_drawn += varying.size
+
+        return np.sort(np.concatenate(drawn)) if drawn else np.empty(0, dtype=np.intp)
+
+    def _split_histogram(
+        self,
+        data: _TrainingData,
+        histogram: np.ndarray,
+        left: _PendingNode,
+        right: _PendingNode,
+        samples: np.ndarray,
+    ) -> None:
+        # only the smaller child is counted, the larger one is its parent minus its sibling
+        if left.end - left.start <= right.end - right.start:
+            small, large = left, right
+        else:
+            small, large = right, left
+
+        if data.binned is None or not _uses_histogram(data.binned, large):
+            return
+
+        small.histogram = self._histogram(data, samples[small.start : small.end])
+        large.histogram = histogram - small.histogram
+
+    def _find_best_histogram_split(self, histogram: np.ndarray) -> tuple[int, int] | None:
+        parent_counts = histogram[0].sum(axis=0)
+        n_samples = parent_counts.sum()
+
+        # left_counts[f, b] holds class counts of bins 0..b of feature f, only boundaries right
+        # after an occupied bin with samples left on the right side yield distinct splits
+        features = None
+        if self._max_features is not None:
+            occupied = np.count_nonzero(class_totals(histogram), axis=1)
+            features = self._draw_features(occupied.size, lambda drawn: occupied[drawn] <= 1)
+            histogram = histogram[features]
+
+        left_counts = np.cumsum(histogram, axis=1)
+        candidates = (class_totals(histogram) > 0) & (class_totals(left_counts) < n_samples)
+        feature_indices, bin_indices = np.nonzero(candidates)
+        if feature_indices.size == 0:
+            return None
+
+        gains = split_gains(left_counts[feature_indices, bin_indices], parent_counts)
+        best = int(np.argmax(gains))
+
+        feature_index = feature_indices[best]
+        if features is not None:
+            feature_index = features[feature_index]
+
+        return int(feature_index), int(bin_indices[best])
+
+    @staticmethod
+    def _histogram(data: _TrainingData, samples: np.ndarray) -> np.ndarray:
+        if data.binned is None:
+            raise ValueError("Histograms need binned features")
+
+        n_features = data.features.size
+        n_labels, n_bins = data.n_labels, data.binned.n_bins
+
+        # bootstrap weights are sample repeats, counting repeated rows keeps bincount in integers
+        samples = np.repeat(samples, data.weights[samples])
+        codes = data.binned.codes[np.ix_(samples, data.features)]
+        offsets = np.arange(n_features) * n_bins
+        flat = (codes + offsets) * n_labels + data.labels[samples, np.newaxis]
+        counts = np.bincount(flat.ravel(), minlength=n_features * n_bins * n_labels)
+
+        return counts.reshape(n_features, n_bins, n_labels)
@@ -1,16 +1,28 @@
-from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from itertools import pairwise
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
 import numpy as np
+import numpy.typing as npt
 
 from src.config import register_config
 
 if TYPE_CHECKING:
     from src.models.classifier import ClassifierName
 
-from .cart import CART, CARTConfig
-from .util import majority_vote
+from src.models.serialization import load_arrays, save_arrays
+
+from .binning import BinnedFeatures, bin_features
+from .cart import CART, CARTConfig, FlatTree
+from .pool import get_pool, pool_size, run_shared, shared_arrays, shutdown_pool
+
+type Aggregate = Callable[[Iterable[np.ndarray], list[np.ndarray], int, int], np.ndarray]
 
 
 @register_config(name="forest")
@@ -19,6 +31,42 @@ class RandomForestConfig:
     tree_config: CARTConfig = field(default_factory=CARTConfig)
     n_trees: int = 100
     multiprocessing: bool = False
+    n_workers: int | None = None  # all CPUs if None, used by parallel fit and inference
+    inference: Literal["serial", "threads", "processes"] = "serial"
+    refit_fraction: float = 1.0  # share of trees retrained by update(), 1 refits all
+    oob_score: bool = False  # out-of-bag probabilities and accuracy after every fit
+    # adaptive size: start with min_trees and add trees up to n_trees, fixed size if None;
+    # "schedule" scales the count with the labeled set relative to the first fit, "stable"
+    # adds min_trees at a time until the standard error of the forest probabilities on the
+    # training set drops below stability_tol
+    min_trees: int | None = None
+    growth: Literal["schedule", "stable"] = "schedule"
+    stability_tol: float = 0.05
+
+
+@dataclass
+class _LeafCache:
+    """Leaves of a fixed matrix per tree, refreshed for trees that changed since."""
+
+    X: np.ndarray
+    trees: list[CART] = field(default_factory=list[CART])
+    tree_leaves: list[np.ndarray] = field(default_factory=list[np.ndarray])
+
+    def leaves(self, trees: list[CART]) -> list[np.ndarray]:
+        # trees are only ever appended to a forest, fewer means a new one
+        if len(self.trees) > len(trees):
+            self.trees = []
+            self.tree_leaves = []
+
+        for index, tree in enumerate(trees):
+            if index == len(self.trees):
+                self.trees.append(tree)
+                self.tree_leaves.append(tree.apply(self.X))
+            elif self.trees[index] is not tree:
+                self.trees[index] = tree
+                self.tree_leaves[index] = tree.apply(self.X)
+
+        return self.tree_leaves
 
 
 class RandomForest:
@@ -28,91 +76,511 @@ class RandomForest:
         if config is None:
             config = RandomForestConfig()
 
+        if not 0 < config.refit_fraction <= 1:
+            raise ValueError(f"refit_fraction must be in (0, 1], got {config.refit_fraction}")
+        if config.min_trees is not None and not 1 <= config.min_trees <= config.n_trees:
+            raise ValueError(
+                f"min_trees must be between 1 and n_trees={config.n_trees}, got {config.min_trees}"
+            )
+
         self._trees: list[CART] = []
-        self._selected_features: list[np.ndarray] = []
+        self._X_train: np.ndarray | None = None
+        self._y_train: np.ndarray | None = None
+        self._tree_seeds = np.zeros(config.n_trees, dtype=np.int64)
+        self._tree_sizes = np.zeros(config.n_trees, dtype=np.int64)
+        self._leaf_votes: list[np.ndarray] = []
+        self._leaf_proba: list[np.ndarray] = []
+        self._caches: list[_LeafCache] = []
         self._n_trees = config.n_trees
         self._tree_config = config.tree_config
         self._multiprocessing = config.multiprocessing
+        self._n_workers = config.n_workers
+        self._inference = config.inference
+        self._refit_fraction = config.refit_fraction
+        self._compute_oob = config.oob_score
+        self._next_refit = 0
+        self._min_trees = config.min_trees
+        self._growth = config.growth
+        self._stability_tol = config.stability_tol
+        self._initial_size = 0
 
     def set_rng(self, seed: int) -> None:
         self._rng = np.random.default_rng(seed)
 
+    @property
+    def incremental(self) -> bool:
+        """Whether update() keeps trees, i.e. refits only some or grows an adaptive forest."""
+        return self._refit_fraction < 1 or self._min_trees is not None
+
     def fit(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
         self._trees = []
-        self._selected_features = []
+        self._X_train = X_train
+        self._y_train = y_train
+        self._next_refit = 0
+        self._initial_size = X_train.shape[0]
+
+        n_trees = self._n_trees if self._min_trees is None else self._min_trees
+        self._refit_trees(X_train, y_train, np.arange(n_trees))
+        self._grow(X_train, y_train)
+
+    def update(self, X_new: np.ndarray, y_new: np.ndarray) -> None:
+        """
+        Add newly labeled samples and retrain the next `refit_fraction` of the trees.
+
+        Retrained trees see every sample labeled so far, the others keep their previous fit;
+        successive updates rotate through the forest, so no tree gets arbitrarily stale.
+        Adaptive forests then add the trees the larger labeled set calls for.
+        """
+        if len(self._trees) == 0:
+            self.fit(X_new, y_new)
+            return
+        if self._X_train is None or self._y_train is None:
+            raise ValueError("Forest was loaded without its training data, call fit() first.")
+        if X_new.shape[0] == 0:
+            return
+
+        X_train = np.concatenate((self._X_train, X_new))
+        y_train = np.concatenate((self._y_train, y_new))
+        self._X_train, self._y_train = X_train, y_train
+
+        n_trees = len(self._trees)
+        n_refit = max(1, round(self._refit_fraction * n_trees))
+        indices = (self._next_refit + np.arange(n_refit)) % n_trees
+        self._next_refit = (self._next_refit + n_refit) % n_trees
+
+        self._refit_trees(X_train, y_train, indices)
+        self._grow(X_train, y_train)
+
+    def save(self, path: Path | str) -> None:
+        """Store the node arrays of all trees in one file, see `load`."""
+        if len(self._trees) == 0:
+            raise ValueError("Forest is not initalized, call fit() first.")
 
-        self.classes = np.unique(y_train)
+        trees = [tree.tree for tree in self._trees]
+        save_arrays(
+            path,
+            "forest",
+            {
+                "classes": self.classes,
+                "node_offsets": np.cumsum([0] + [tree.node_count for tree in trees]),
+                "leaf_offsets": np.cumsum([0] + [tree.proba.shape[0] for tree in trees]),
+                "feature": np.concatenate([tree.feature for tree in trees]),
+                "threshold": np.concatenate([tree.threshold for tree in trees]),
+                "left": np.concatenate([tree.left for tree in trees]),
+                "right": np.concatenate([tree.right for tree in trees]),
+                "value": np.concatenate([tree.value for tree in trees]),
+                # leaves are stored aligned to the forest classes
+                "proba": np.concatenate(self._leaf_proba),
+            },
+        )
 
-        seeds = self._rng.integers(0, 2**32 - 1, size=self._n_trees)
-        if self._multiprocessing:
-            with ProcessPoolExecutor() as executor:
-                result = executor.map(
-                    self._build_single_tree,
-                    [X_train] * self._n_trees,
-                    [y_train] * self._n_trees,
-                    seeds,
-                )
-
-            for tree, indices in result:
-                self._trees.append(tree)
-                self._selected_features.append(indices)
+    @classmethod
+    def load(
+        cls, path: Path | str, config: RandomForestConfig | None = None, mmap: bool = True
+    ) -> "RandomForest":
+        """
+        Load a forest stored by `save`, predicting exactly like the saved one.
+
+        With `mmap`, trees are views of the file mapped read-only, so loading copies nothing
+        and processes loading the same file share its pages. The forest can be fit again,
+        updating it requires a fit first.
+        """
+        arrays = load_arrays(path, "forest", mmap)
+
+        forest = cls(config)
+        forest.classes = np.array(arrays["classes"])
+
+        nodes = pairwise(arrays["node_offsets"].tolist())
+        leaves = pairwise(arrays["leaf_offsets"].tolist())
+        for (node_start, node_end), (leaf_start, leaf_end) in zip(nodes, leaves, strict=True):
+            tree = FlatTree(
+                feature=arrays["feature"][node_start:node_end],
+                threshold=arrays["threshold"][node_start:node_end],
+                left=arrays["left"][node_start:node_end],
+                right=arrays["right"][node_start:node_end],
+                value=arrays["value"][node_start:node_end],
+                proba=arrays["proba"][leaf_start:leaf_end],
+            )
+            forest._trees.append(CART.from_tree(forest._tree_config, tree, forest.classes))
+
+        forest._align_leaves()
+        return forest
+
+    def register(self, X: np.ndarray) -> None:
+        """
+        Cache the leaves every tree assigns to the rows of X, which must not change afterwards.
+
+        Predictions on this very matrix then only evaluate trees refit since the last call,
+        e.g. the pool and test set of a learner run, where updates retrain few trees. A
+        forest whose updates replace every tree would never hit the cache, it ignores X.
+        """
+        if not self.incremental:
+            return
+        if not self.is_registered(X):
+            self._caches.append(_LeafCache(X))
+
+    def is_registered(self, X: np.ndarray) -> bool:
+        return any(cache.X is X for cache in self._caches)
+
+    @property
+    def node_counts(self) -> np.ndarray:
+        return np.array([tree.node_count for tree in self._trees])
+
+    def diagnostics(self) -> dict[str, float]:
+        if len(self._trees) == 0:
+            return {}
 
-        else:
-            for i in range(self._n_trees):
-                tree, indices = self._build_single_tree(X_train, y_train, seeds[i])
-                self._trees.append(tree)
-                self._selected_features.append(indices)
+        diagnostics = {
+            "n_trees": float(len(self._trees)),
+            "nodes_per_tree": float(np.mean(self.node_counts)),
+        }
+        if self._compute_oob:
+            diagnostics["oob_score"] = self.oob_score
+
+        return diagnostics
 
     def predict(self, X: np.ndarray) -> np.ndarray:
         if len(self._trees) == 0:
             raise ValueError("Forest is not initalized, call fit() first.")
 
-        all_predictions = self._collect_tree_labels(X)
+        votes = self._aggregate(_count_votes, X, self._leaf_votes)
 
-        return np.apply_along_axis(majority_vote, 1, all_predictions)
+        # argmax picks the smallest label among tied votes, as the majority vote does
+        return self.classes[np.argmax(votes, axis=1)]
 
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         if len(self._trees) == 0:
             raise ValueError("Forest is not initalized, call fit() first.")
 
-        all_predictions = self._collect_tree_proba(X)
-
-        return np.mean(all_predictions, axis=1)
-
-    def _collect_tree_labels(self, X: np.ndarray) -> np.ndarray:
-        return np.stack(
-            [tree.predict(X[:, self._selected_features[i]]) for i, tree in enumerate(self._trees)],
-            axis=1,
-        )
-
-    def _collect_tree_proba(self, X: np.ndarray) -> np.ndarray:
-        all_proba: list[np.ndarray] = []
-
-        for i, tree in enumerate(self._trees):
-            proba = tree.predict_proba(X[:, self._selected_features[i]])
-            aligned = np.zeros((proba.shape[0], self.classes.shape[0]))
-
-            indices = np.searchsorted(self.classes, tree.classes)
-            aligned[:, indices] = proba
-
-            all_proba.append(aligned)
-
-        return np.stack(all_proba, axis=1)
+        return self._aggregate(_sum_proba, X, self._leaf_proba) / len(self._trees)
+
+    def _aggregate(
+        self, aggregate: Aggregate, X: np.ndarray, leaf_values: list[np.ndarray]
+    ) -> np.ndarray:
+        """
+        Aggregate all trees over X, from cached leaves if X is registered, otherwise split
+        into row chunks for the parallel inference modes.
+
+        Every row is aggregated over the trees in the same order whatever its chunk, so
+        parallel and cached results are identical to serial ones.
+        """
+        n_samples, n_classes = int(X.shape[0]), self.classes.size
+        for cache in self._caches:
+            if cache.X is X:
+                return aggregate(cache.leaves(self._trees), leaf_values, n_samples, n_classes)
+
+        n_workers = self._n_workers or os.cpu_count() or 1
+        n_chunks = min(n_workers, n_samples)
+        if self._inference == "serial" or n_chunks <= 1:
+            return _aggregate_rows(aggregate, X, 0, n_samples, self._trees, leaf_values, n_classes)
+
+        bounds = [int(bound) for bound in np.linspace(0, n_samples, n_chunks + 1)]
+        chunks = list(pairwise(bounds))
+
+        if self._inference == "threads":
+            # tree traversal is mostly numpy fancy indexing, which releases the GIL
+            with ThreadPoolExecutor(n_workers) as executor:
+                futures = [
+                    executor.submit(
+                        _aggregate_rows,
+                        aggregate,
+                        X,
+                        start,
+                        end,
+                        self._trees,
+                        leaf_values,
+                        n_classes,
+                    )
+                    for start, end in chunks
+                ]
+                return np.concatenate([future.result() for future in futures])
+
+        executor = get_pool(self._n_workers)
+        try:
+            with shared_arrays(X) as (X_shared,):
+                futures = [
+                    executor.submit(
+                        run_shared,
+                        _aggregate_rows,
+                        aggregate,
+                        X_shared,
+                        start,
+                        end,
+                        self._trees,
+                        leaf_values,
+                        n_classes,
+                    )
+                    for start, end in chunks
+                ]
+                return np.concatenate([future.result() for future in futures])
+        except BrokenProcessPool:
+            shutdown_pool()
+            raise
+
+    def _align_leaves(self) -> None:
+        """
+        Map the leaves of every tree onto the forest classes once per fit.
+
+        A bootstrap may miss some classes, so tree and forest columns can differ; inference
+        then only gathers rows of these arrays into one (n_samples, n_classes) buffer.
+        """
+        self._leaf_votes = []
+        self._leaf_proba = []
+
+        for tree in self._trees:
+            columns = np.searchsorted(self.classes, tree.classes)
+            tree_proba = tree.tree.proba
+
+            leaf_proba = tree_proba
+            if columns.size < self.classes.size:
+                leaf_proba = np.zeros((tree_proba.shape[0], self.classes.size))
+                leaf_proba[:, columns] = tree_proba
+
+            self._leaf_votes.append(columns[np.argmax(tree_proba, axis=1)])
+            self._leaf_proba.append(leaf_proba)
+
+    def _refit_trees(self, X_train: np.ndarray, y_train: np.ndarray, indices: np.ndarray) -> None:
+        self.classes = np.unique(y_train)
 
-    def _build_single_tree(
-        self, X_train: np.ndarray, y_train: np.ndarray, seed: int
-    ) -> tuple[CART, np.ndarray]:
+        seeds = self._rng.integers(0, 2**32 - 1, size=indices.size)
         n_samples, n_features = X_train.shape
 
-        rng = np.random.default_rng(seed)
+        # features are binned or sorted once, every tree derives its own view from that;
+        # random splits and trees sampling features per node need neither. Only columns
+        # some rebuilt tree splits on are binned. Trees sort their own sqrt(d) features
+        # otherwise, so sorting all d only pays off once the rebuilt trees cover as many
+        # columns between them, not for small refits
+        binned = None
+        presorted = None
+        if self._tree_config.max_bins is not None:
+            drawn = [
+                _draw_tree(seed, n_samples, n_features, self._tree_config)[2] for seed in seeds
+            ]
+            binned = bin_features(
+                X_train, self._tree_config.max_bins, np.unique(np.concatenate(drawn))
+            )
+        elif (
+            self._tree_config.splitter == "best"
+            and self._tree_config.max_features is None
+            and indices.size * int(np.sqrt(n_features)) >= n_features
+        ):
+            presorted = np.argsort(X_train.T, axis=1, kind="stable")
 
-        samples_indices = rng.choice(n_samples, int(n_samples), replace=True)
-        features_indices = rng.choice(n_features, int(np.sqrt(n_features)), replace=False)
+        if self._multiprocessing:
+            trees = self._build_trees_parallel(X_train, y_train, seeds, binned, presorted)
+        else:
+            trees = _build_trees(X_train, y_train, seeds, self._tree_config, binned, presorted)
 
-        X_bootstrap = X_train[np.ix_(samples_indices, features_indices)]
-        y_bootstrap = y_train[samples_indices]
+        for index, tree in zip(indices, trees, strict=True):
+            if index == len(self._trees):
+                self._trees.append(tree)
+            else:
+                self._trees[index] = tree
+
+        self._tree_seeds[indices] = seeds
+        self._tree_sizes[indices] = X_train.shape[0]
+        self._align_leaves()
+
+        if self._compute_oob:
+            self._estimate_oob(X_train, y_train)
+
+    def _grow(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        """Add trees to an adaptive forest, keeping the ones it has."""
+        if self._min_trees is None:
+            return
+
+        n_trees = len(self._trees)
+        if self._growth == "schedule":
+            scaled = round(self._min_trees * int(X_train.shape[0]) / self._initial_size)
+            target = min(max(scaled, n_trees), self._n_trees)
+            if target > n_trees:
+                self._refit_trees(X_train, y_train, np.arange(n_trees, target))
+            return
+
+        while n_trees < self._n_trees and self._standard_error(X_train) > self._stability_tol:
+            target = min(n_trees + self._min_trees, self._n_trees)
+            self._refit_trees(X_train, y_train, np.arange(n_trees, target))
+            n_trees = target
+
+    def _standard_error(self, X: np.ndarray) -> float:
+        """Mean standard error of the forest probabilities over the rows of X and classes."""
+        per_tree: list[npt.NDArray[np.float64]] = [
+            leaf_proba[tree.apply(X)]
+            for tree, leaf_proba in zip(self._trees, self._leaf_proba, strict=True)
+        ]
+        spread = np.std(np.stack(per_tree), axis=0)
+        return float(np.mean(spread / math.sqrt(len(self._trees))))
+
+    def _estimate_oob(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        """
+        Average every training sample over the trees that did not draw it.
+
+        Bootstraps are replayed from the tree seeds; samples added after a tree was fit are
+        out of its bag as well. Samples drawn by every tree get NaN probabilities.
+        """
+        n_samples = int(X_train.shape[0])
+        proba = np.zeros((n_samples, self.classes.size))
+        n_trees = np.zeros(n_samples, dtype=np.int64)
+
+        for tree, leaf_proba, seed, size in zip(
+            self._trees,
+            self._leaf_proba,
+            self._tree_seeds[: len(self._trees)],
+            self._tree_sizes[: len(self._trees)],
+            strict=True,
+        ):
+            sample_weight = _bootstrap(np.random.default_rng(seed), int(size))
+            out_of_bag: list[npt.NDArray[np.intp]] = [
+                np.flatnonzero(sample_weight == 0),
+                np.arange(int(size), n_samples),
+            ]
+            oob = np.concatenate(out_of_bag)
+
+            proba[oob] += leaf_proba[tree.apply(X_train[oob])]
+            n_trees[oob] += 1
+
+        seen = n_trees > 0
+        proba[seen] /= n_trees[seen, np.newaxis]
+        proba[~seen] = np.nan
+
+        self.oob_proba = proba
+        predicted = self.classes[np.argmax(proba[seen], axis=1)]
+        self.oob_score = (
+            float(np.mean(np.equal(predicted, y_train[seen]))) if np.any(seen) else np.nan
+        )
 
-        tree = CART(self._tree_config)
-        tree.fit(X_bootstrap, y_bootstrap)
+    def _build_trees_parallel(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        seeds: np.ndarray,
+        binned: BinnedFeatures | None,
+        presorted: np.ndarray | None,
+    ) -> list[CART]:
+        executor = get_pool(self._n_workers)
+
+        # one task per worker reading the training matrices from shared memory, so they are
+        # copied once per fit rather than pickled per tree; every tree depends on its own
+        # seed only, so chunking does not change it
+        n_chunks = min(pool_size(), seeds.size)
+        codes, edges = (binned.codes, binned.edges) if binned is not None else (None, None)
+        try:
+            with shared_arrays(X_train, codes, presorted) as shared:
+                X_shared, codes_shared, presorted_shared = shared
+                futures = [
+                    executor.submit(
+                        run_shared,
+                        _build_trees_shared,
+                        X_shared,
+                        y_train,
+                        chunk,
+                        self._tree_config,
+                        codes_shared,
+                        edges,
+                        presorted_shared,
+                    )
+                    for chunk in np.array_split(seeds, n_chunks)
+                ]
+
+                return [tree for future in futures for tree in future.result()]
+        except BrokenProcessPool:
+            shutdown_pool()
+            raise
+
+
+def _build_trees(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    seeds: np.ndarray,
+    tree_config: CARTConfig,
+    binned: BinnedFeatures | None = None,
+    presorted: np.ndarray | None = None,
+) -> list[CART]:
+    n_samples, n_features = X_train.shape
+    trees: list[CART] = []
+
+    for seed in seeds:
+        rng, sample_weight, features_indices = _draw_tree(seed, n_samples, n_features, tree_config)
+
+        tree_presorted = None
+        if presorted is not None:
+            tree_presorted = presorted[features_indices]
+
+        tree = CART(tree_config, rng)
+        tree.fit(X_train, y_train, sample_weight, features_indices, binned, tree_presorted)
+        trees.append(tree)
+
+    return trees
+
+
+def _draw_tree(
+    seed: int, n_samples: int, n_features: int, tree_config: CARTConfig
+) -> tuple[np.random.Generator, np.ndarray, npt.NDArray[np.intp]]:
+    """Generator, bootstrap counts and candidate features of the tree grown from `seed`."""
+    rng = np.random.default_rng(seed)
+    sample_weight = _bootstrap(rng, n_samples)
+
+    # trees sampling features per node see all of them, the others a fixed sqrt(d)
+    features_indices: npt.NDArray[np.intp] = np.arange(n_features)
+    if tree_config.max_features is None:
+        features_indices = rng.choice(n_features, int(np.sqrt(n_features)), replace=False)
 
-        return tree, features_indices
+    return rng, sample_weight, features_indices
+
+
+def _bootstrap(rng: np.random.Generator, n_samples: int) -> np.ndarray:
+    """
+    Per-sample draw counts, the first draw of every tree generator. Trees weight the shared
+    training matrix with them instead of copying the drawn rows.
+    """
+    samples_indices = rng.choice(n_samples, int(n_samples), replace=True)
+
+    return np.bincount(samples_indices, minlength=n_samples)
+
+
+def _build_trees_shared(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    seeds: np.ndarray,
+    tree_config: CARTConfig,
+    codes: np.ndarray | None,
+    edges: np.ndarray | None,
+    presorted: np.ndarray | None,
+) -> list[CART]:
+    """`_build_trees` in a pool worker, on matrices read from shared memory."""
+    binned = BinnedFeatures(codes, edges) if codes is not None and edges is not None else None
+    return _build_trees(X_train, y_train, seeds, tree_config, binned, presorted)
+
+
+def _count_votes(
+    leaves: Iterable[np.ndarray], leaf_votes: list[np.ndarray], n_samples: int, n_classes: int
+) -> np.ndarray:
+    votes = np.zeros((n_samples, n_classes), dtype=np.int64)
+    rows = np.arange(n_samples)
+    for tree_leaves, tree_votes in zip(leaves, leaf_votes, strict=True):
+        votes[rows, tree_votes[tree_leaves]] += 1
+
+    return votes
+
+
+def _sum_proba(
+    leaves: Iterable[np.ndarray], leaf_proba: list[np.ndarray], n_samples: int, n_classes: int
+) -> np.ndarray:
+    proba = np.zeros((n_samples, n_classes))
+    for tree_leaves, tree_proba in zip(leaves, leaf_proba, strict=True):
+        proba += tree_proba[tree_leaves]
+
+    return proba
+
+
+def _aggregate_rows(
+    aggregate: Aggregate,
+    X: np.ndarray,
+    start: int,
+    end: int,
+    trees: list[CART],
+    leaf_values: list[np.ndarray],
+    n_classes: int,
+) -> np.ndarray:
+    X_rows = X[start:end]
+    return aggregate((tree.apply(X_rows) for tree in trees), leaf_values, end - start, n_classes)
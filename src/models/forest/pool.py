@@ -0,0 +1,118 @@
+import atexit
+import os
+from collections.abc import Callable, Generator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+
+_executor: ProcessPoolExecutor | None = None
+_n_workers: int = 0
+
+
+def get_pool(n_workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    Return the process pool shared by all forests, creating it on first use.
+
+    Workers outlive single fits, so processes are spawned once per run instead of once per
+    fit. Asking for a different number of workers replaces the pool.
+
+    Args:
+        n_workers: Number of worker processes, all CPUs if None
+    """
+    global _executor, _n_workers
+
+    n_workers = n_workers or os.cpu_count() or 1
+    if _executor is not None and _n_workers != n_workers:
+        shutdown_pool()
+
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=n_workers)
+        _n_workers = n_workers
+
+    return _executor
+
+
+def pool_size() -> int:
+    return _n_workers if _executor is not None else 0
+
+
+def shutdown_pool() -> None:
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+atexit.register(shutdown_pool)
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """
+    Picklable reference to an array stored in a shared memory segment.
+
+    Workers attach to the segment by name, so only this handle is sent to them.
+    """
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@contextmanager
+def shared_arrays(*arrays: np.ndarray | None) -> Generator[list[SharedArray | None]]:
+    """
+    Copy arrays into shared memory segments for the duration of the context.
+
+    Segments are owned and unlinked by the calling process, so they are released even
+    when a worker crashes while attached to them. None is passed through.
+    """
+    with ExitStack() as stack:
+        handles: list[SharedArray | None] = []
+        for array in arrays:
+            if array is None:
+                handles.append(None)
+                continue
+
+            segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+            stack.callback(segment.unlink)
+            stack.callback(segment.close)
+
+            np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+            handles.append(SharedArray(segment.name, array.shape, array.dtype.str))
+
+        yield handles
+
+
+def run_shared(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Call fn in a worker with every SharedArray argument replaced by a view of its segment.
+
+    The result must not keep references to the shared views, they are unmapped on return.
+    """
+    segments: list[SharedMemory] = []
+    resolved: list[Any] = []
+    for arg in args:
+        if isinstance(arg, SharedArray):
+            # the creating process is the only one tracking the segment
+            segment = SharedMemory(arg.name, track=False)
+            segments.append(segment)
+            arg = np.ndarray(arg.shape, np.dtype(arg.dtype), buffer=segment.buf)
+        resolved.append(arg)
+
+    try:
+        return fn(*resolved)
+    finally:
+        # views must be released before their segment can be closed
+        resolved.clear()
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                # a traceback still references a view, the mapping goes with it
+                pass
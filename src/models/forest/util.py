@@ -16,3 +16,34 @@ def gini_impurity(counts: np.ndarray) -> float:
         return 0.0
 
     return float(1 - np.sum(np.power(probabilities, 2)))
+
+
+def gini_impurity_batch(counts: np.ndarray) -> np.ndarray:
+    # empty rows get an impurity of 1, they are weighted by their zero size in split gains
+    probabilities = counts / np.maximum(class_totals(counts), 1)[..., np.newaxis]
+
+    return 1 - class_totals(np.power(probabilities, 2))
+
+
+def split_gains(left_counts: np.ndarray, parent_counts: np.ndarray) -> np.ndarray:
+    n_samples = np.sum(parent_counts)
+    right_counts = parent_counts - left_counts
+
+    n_left = class_totals(left_counts)
+    n_right = class_totals(right_counts)
+
+    return (
+        gini_impurity(parent_counts)
+        - (n_left / n_samples) * gini_impurity_batch(left_counts)
+        - (n_right / n_samples) * gini_impurity_batch(right_counts)
+    )
+
+
+def class_totals(counts: np.ndarray) -> np.ndarray:
+    # summing the few class columns one by one is much faster than a reduction over a short
+    # last axis and adds them in the same order as np.sum does for such short rows
+    total = counts[..., 0]
+    for class_index in range(1, counts.shape[-1]):
+        total = total + counts[..., class_index]
+
+    return total
@@ -0,0 +1,441 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from src.config import register_config
+from src.models.forest.cart import MaxFeatures, parse_max_features, resolve_max_features
+
+if TYPE_CHECKING:
+    from src.models.classifier import ClassifierName
+
+
+@register_config(name="mondrian", field_parsers={"max_features": parse_max_features})
+@dataclass
+class MondrianForestConfig:
+    n_trees: int = 10
+    lifetime: float | None = None  # budget of the Mondrian process, unbounded if None
+    smoothing: float = 1.0  # pull of every node's class distribution towards its parent's
+    max_features: MaxFeatures | None = "sqrt"  # features drawn per tree, all if None
+
+
+class MondrianTree:
+    """
+    Mondrian tree grown online, one sample at a time.
+
+    Nodes keep the bounding box of the samples below them. A new sample outside a box
+    may cut it off with a split above the node, otherwise it descends to a leaf.
+    Leaves stop splitting while pure and resume once a sample of another class arrives.
+    An impure leaf that cannot split, as its cut would fall beyond the lifetime or all
+    its samples coincide, is paused until a sample outside its box arrives.
+
+    Args:
+        features: Columns of the input the tree splits on
+        n_classes: Number of classes known so far
+        lifetime: Split times beyond it are never drawn
+        rng: Random generator of the tree
+    """
+
+    def __init__(
+        self, features: np.ndarray, n_classes: int, lifetime: float, rng: np.random.Generator
+    ) -> None:
+        self.features = features
+        self.lifetime = lifetime
+        self.rng = rng
+        self.root = -1
+        self.node_count = 0
+
+        capacity = 16
+        self.lower = np.empty((capacity, features.size))
+        self.upper = np.empty((capacity, features.size))
+        self.tau = np.empty(capacity)
+        self.feature = np.empty(capacity, dtype=np.intp)
+        self.threshold = np.empty(capacity)
+        self.left = np.empty(capacity, dtype=np.intp)
+        self.right = np.empty(capacity, dtype=np.intp)
+        self.parent = np.empty(capacity, dtype=np.intp)
+        self.counts = np.empty((capacity, n_classes))
+
+        # samples held by every leaf, split once the leaf turns impure
+        self.samples: dict[int, list[int]] = {}
+        # impure leaves that failed to split, skipped while samples fall inside their box
+        self.paused: set[int] = set()
+
+    def add_class(self, index: int) -> None:
+        self.counts = np.insert(self.counts, index, 0, axis=1)
+
+    def extend(self, X: np.ndarray, labels: np.ndarray, index: int) -> None:
+        """
+        Add sample `index` of `X`, touching only the nodes on its path.
+
+        Args:
+            X: Every sample seen by the forest, (n_samples, n_features)
+            labels: Class index of every sample in `X`
+            index: Row of the new sample
+        """
+        x = X[index, self.features]
+        label = labels[index]
+
+        if self.root < 0:
+            self.root = self._add_leaf(x, x, label, -1)
+            self.samples[self.root] = [index]
+            return
+
+        node = self.root
+        while True:
+            extent = np.maximum(self.lower[node] - x, 0) + np.maximum(x - self.upper[node], 0)
+            rate = extent.sum()
+            if rate > 0:
+                split_time = self._parent_tau(node) + self.rng.exponential(1 / rate)
+                if split_time < self.tau[node]:
+                    self._split_above(node, x, index, label, extent, split_time)
+                    return
+
+            np.minimum(self.lower[node], x, out=self.lower[node])
+            np.maximum(self.upper[node], x, out=self.upper[node])
+            self.counts[node, label] += 1
+
+            if self.feature[node] < 0:
+                self.samples[node].append(index)
+                if rate > 0:
+                    self.paused.discard(node)
+                if node not in self.paused and np.count_nonzero(self.counts[node]) > 1:
+                    self._split_leaf(X, labels, node)
+                return
+
+            if x[self.feature[node]] < self.threshold[node]:
+                node = self.left[node]
+            else:
+                node = self.right[node]
+
+    def posterior(self, smoothing: float) -> np.ndarray:
+        """
+        Class distribution of every node, (node_count, n_classes).
+
+        Counts of a node are smoothed towards the distribution of its parent, the root's
+        towards uniform, so nodes holding few samples stay close to their ancestors.
+        """
+        n_classes = self.counts.shape[1]
+        posterior = np.empty((self.node_count, n_classes))
+
+        counts = self.counts[self.root]
+        posterior[self.root] = (counts + smoothing / n_classes) / (counts.sum() + smoothing)
+
+        level = np.array([self.root])
+        while level.size:
+            level = level[self.feature[level] >= 0]
+            level = np.concatenate((self.left[level], self.right[level]))
+            counts = self.counts[level]
+            prior = posterior[self.parent[level]]
+            posterior[level] = (counts + smoothing * prior) / (
+                counts.sum(axis=1, keepdims=True) + smoothing
+            )
+
+        return posterior
+
+    def predict_proba(self, X: np.ndarray, smoothing: float) -> np.ndarray:
+        """
+        Class probabilities of the rows of `X`, already restricted to the tree's features.
+
+        Along its path a sample outside a node's box would have been cut off by a split
+        above the node with probability 1 - exp(-(tau - parent tau) * distance to the box).
+        That share of its probability falls back to the parent's distribution, so samples
+        far from the training data get vaguer predictions.
+        """
+        posterior = self.posterior(smoothing)
+        n_samples, n_classes = int(X.shape[0]), posterior.shape[1]
+        uniform = np.full(n_classes, 1 / n_classes)
+
+        proba = np.zeros((n_samples, n_classes))
+        remaining = np.ones(n_samples)
+        nodes = np.full(n_samples, self.root)
+        # rows of X still descending, the others reached their leaf
+        active: npt.NDArray[np.intp] = np.arange(n_samples)
+
+        while active.size:
+            node = nodes[active]
+            x = X[active]
+            parent = self.parent[node]
+            has_parent = parent >= 0
+
+            extent = np.maximum(self.lower[node] - x, 0) + np.maximum(x - self.upper[node], 0)
+            distance = extent.sum(axis=1)
+            duration = self.tau[node] - np.where(has_parent, self.tau[parent], 0.0)
+            with np.errstate(invalid="ignore"):
+                separated = np.where(distance > 0, -np.expm1(-duration * distance), 0.0)
+
+            prior = np.where(has_parent[:, np.newaxis], posterior[parent], uniform)
+            proba[active] += (remaining[active] * separated)[:, np.newaxis] * prior
+            remaining[active] *= 1 - separated
+
+            leaf = self.feature[node] < 0
+            proba[active[leaf]] += remaining[active[leaf], np.newaxis] * posterior[node[leaf]]
+
+            active, node, x = active[~leaf], node[~leaf], x[~leaf]
+            goes_left = x[np.arange(active.size), self.feature[node]] < self.threshold[node]
+            nodes[active] = np.where(goes_left, self.left[node], self.right[node])
+
+        return proba
+
+    def _parent_tau(self, node: int) -> float:
+        parent = self.parent[node]
+        return float(self.tau[parent]) if parent >= 0 else 0.0
+
+    def _split_above(
+        self,
+        node: int,
+        x: np.ndarray,
+        index: int,
+        label: int,
+        extent: np.ndarray,
+        split_time: float,
+    ) -> None:
+        feature = int(self.rng.choice(extent.size, p=extent / extent.sum()))
+        above = x[feature] > self.upper[node, feature]
+        low, high = (
+            (self.upper[node, feature], x[feature])
+            if above
+            else (x[feature], self.lower[node, feature])
+        )
+        # drawn in (low, high], so the node's samples and x land on different sides
+        threshold = high - self.rng.random() * (high - low)
+
+        grandparent = self.parent[node]
+        parent = self._add_node(
+            np.minimum(self.lower[node], x),
+            np.maximum(self.upper[node], x),
+            split_time,
+            self.counts[node],
+            grandparent,
+        )
+        self.counts[parent, label] += 1
+        self.feature[parent] = feature
+        self.threshold[parent] = threshold
+
+        leaf = self._add_leaf(x, x, label, parent)
+        self.samples[leaf] = [index]
+        self.left[parent], self.right[parent] = (node, leaf) if above else (leaf, node)
+
+        self.parent[node] = parent
+        if grandparent < 0:
+            self.root = parent
+        elif self.left[grandparent] == node:
+            self.left[grandparent] = parent
+        else:
+            self.right[grandparent] = parent
+
+    def _split_leaf(self, X: np.ndarray, labels: np.ndarray, leaf: int) -> None:
+        stack = [leaf]
+        while stack:
+            node = stack.pop()
+            samples = np.array(self.samples[node])
+            node_labels = labels[samples]
+            if np.all(node_labels == node_labels[0]):
+                continue
+
+            points = X[np.ix_(samples, self.features)]
+            lower, upper = points.min(axis=0), points.max(axis=0)
+            extent = upper - lower
+            rate = extent.sum()
+            if rate == 0:
+                self.paused.add(node)
+                continue
+
+            split_time = self._parent_tau(node) + self.rng.exponential(1 / rate)
+            if split_time >= self.lifetime:
+                self.paused.add(node)
+                continue
+
+            feature = int(self.rng.choice(extent.size, p=extent / rate))
+            threshold = upper[feature] - self.rng.random() * extent[feature]
+            goes_left = points[:, feature] < threshold
+
+            self.tau[node] = split_time
+            self.feature[node] = feature
+            self.threshold[node] = threshold
+            del self.samples[node]
+
+            children: list[int] = []
+            for side in (goes_left, ~goes_left):
+                side_points = points[side]
+                child = self._add_node(
+                    side_points.min(axis=0),
+                    side_points.max(axis=0),
+                    self.lifetime,
+                    np.bincount(node_labels[side], minlength=self.counts.shape[1]),
+                    node,
+                )
+                self.samples[child] = samples[side].tolist()
+                children.append(child)
+
+            self.left[node], self.right[node] = children
+            stack.extend(children)
+
+    def _add_leaf(self, lower: np.ndarray, upper: np.ndarray, label: int, parent: int) -> int:
+        counts = np.zeros(self.counts.shape[1])
+        counts[label] = 1
+        return self._add_node(lower, upper, self.lifetime, counts, parent)
+
+    def _add_node(
+        self, lower: np.ndarray, upper: np.ndarray, tau: float, counts: np.ndarray, parent: int
+    ) -> int:
+        if self.node_count == self.tau.size:
+            self._grow()
+
+        node = self.node_count
+        self.node_count += 1
+        self.lower[node] = lower
+        self.upper[node] = upper
+        self.tau[node] = tau
+        self.feature[node] = -1
+        self.threshold[node] = np.nan
+        self.left[node] = -1
+        self.right[node] = -1
+        self.parent[node] = parent
+        self.counts[node] = counts
+        return node
+
+    def _grow(self) -> None:
+        for name in (
+            "lower",
+            "upper",
+            "tau",
+            "feature",
+            "threshold",
+            "left",
+            "right",
+            "parent",
+            "counts",
+        ):
+            array = getattr(self, name)
+            grown = np.empty((2 * array.shape[0], *array.shape[1:]), dtype=array.dtype)
+            grown[: array.shape[0]] = array
+            setattr(self, name, grown)
+
+
+class MondrianForest:
+    """
+    Online Mondrian forest classifier.
+
+    `update` adds labeled samples to every tree at an expected cost logarithmic in the
+    number of samples seen, independent of how many were labeled before. Predictions
+    fall back towards the class prior away from the training data, which keeps the
+    probabilities informative for uncertainty sampling.
+    """
+
+    name: "ClassifierName" = "mondrian"
+
+    def __init__(self, config: MondrianForestConfig | None = None) -> None:
+        if config is None:
+            config = MondrianForestConfig()
+
+        if config.lifetime is not None and config.lifetime <= 0:
+            raise ValueError(f"lifetime must be positive, got {config.lifetime}")
+        if config.smoothing <= 0:
+            raise ValueError(f"smoothing must be positive, got {config.smoothing}")
+        resolve_max_features(config.max_features, 1)
+
+        self._n_trees = config.n_trees
+        self._lifetime = np.inf if config.lifetime is None else config.lifetime
+        self._smoothing = config.smoothing
+        self._max_features: MaxFeatures | None = config.max_features
+        self._trees: list[MondrianTree] = []
+        # samples and class indices seen so far, the first n_samples rows of buffers that
+        # double when full, so updates never copy everything labeled before
+        self._X_train: np.ndarray | None = None
+        self._labels = np.empty(0, dtype=np.intp)
+        self._n_samples = 0
+        self._classes = np.empty(0)
+        self._rng = np.random.default_rng()
+
+    def set_rng(self, seed: int) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def incremental(self) -> bool:
+        return True
+
+    @property
+    def node_counts(self) -> list[int]:
+        return [tree.node_count for tree in self._trees]
+
+    def diagnostics(self) -> dict[str, float]:
+        return {"nodes_per_tree": float(np.mean(self.node_counts))}
+
+    def fit(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        self._trees = []
+        self._X_train = None
+        self._n_samples = 0
+        self._classes = np.empty(0, dtype=y_train.dtype)
+        self.update(X_train, y_train)
+
+    def update(self, X_new: np.ndarray, y_new: np.ndarray) -> None:
+        """Extend every tree with the new samples, in order."""
+        if X_new.shape[0] == 0:
+            return
+
+        if self._X_train is None:
+            n_features = X_new.shape[1]
+            n_drawn = resolve_max_features(self._max_features, n_features)
+            seeds = self._rng.integers(0, 2**32, size=self._n_trees)
+            self._trees = [
+                MondrianTree(
+                    np.sort(rng.choice(n_features, n_drawn, replace=False)), 0, self._lifetime, rng
+                )
+                for rng in map(np.random.default_rng, seeds)
+            ]
+            self._X_train = np.empty((X_new.shape[0], n_features), dtype=X_new.dtype)
+            self._labels = np.empty(X_new.shape[0], dtype=np.intp)
+
+        start, end = self._n_samples, self._n_samples + X_new.shape[0]
+        X_train = self._reserve(end)
+        self._add_classes(np.unique(y_new))
+        X_train[start:end] = X_new
+        self._labels[start:end] = np.searchsorted(self._classes, y_new)
+        self._n_samples = end
+
+        for index in range(start, end):
+            for tree in self._trees:
+                tree.extend(X_train, self._labels, index)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if not self._trees:
+            raise ValueError("The model has not been fitted yet")
+
+        proba = np.zeros((X.shape[0], self._classes.size))
+        for tree in self._trees:
+            proba += tree.predict_proba(X[:, tree.features], self._smoothing)
+
+        return proba / len(self._trees)
+
+    def _reserve(self, n_samples: int) -> np.ndarray:
+        """Grow the sample buffers to hold `n_samples` rows, at least doubling them."""
+        assert self._X_train is not None
+        capacity = self._X_train.shape[0]
+        if n_samples > capacity:
+            capacity = max(2 * capacity, n_samples)
+            X_train = np.empty((capacity, self._X_train.shape[1]), dtype=self._X_train.dtype)
+            X_train[: self._n_samples] = self._X_train[: self._n_samples]
+            labels = np.empty(capacity, dtype=np.intp)
+            labels[: self._n_samples] = self._labels[: self._n_samples]
+            self._X_train, self._labels = X_train, labels
+
+        return self._X_train
+
+    def _add_classes(self, classes: np.ndarray) -> None:
+        new_classes = np.setdiff1d(classes, self._classes)
+        positions = np.searchsorted(self._classes, new_classes)
+        self._classes = np.insert(self._classes, positions, new_classes)
+
+        # new classes are sorted, each lands after the ones inserted before it
+        for index in (positions + np.arange(new_classes.size)).tolist():
+            for tree in self._trees:
+                tree.add_class(index)
+
+            # only a new class moves the indices of the stored samples
+            labels = self._labels[: self._n_samples]
+            labels[labels >= index] += 1
@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"ALMODEL\0"
+VERSION = 1
+ALIGNMENT = 64
+
+# magic, version and header length precede the JSON header
+_PREFIX_SIZE = len(MAGIC) + 8
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_arrays(path: Path | str, kind: str, arrays: dict[str, np.ndarray]) -> None:
+    """
+    Write arrays into one file: a JSON header describing them, then their raw data.
+
+    Every array starts on a 64-byte boundary, so the file can be memory-mapped as is.
+
+    Args:
+        path: Destination file
+        kind: Model stored in the file, checked when loading
+        arrays: Arrays to store by name, object arrays are not supported
+    """
+    entries: dict[str, dict[str, object]] = {}
+    contiguous: list[np.ndarray] = []
+    offset = 0
+    for name, array in arrays.items():
+        if array.dtype.hasobject:
+            raise ValueError(f"Array {name} holds Python objects and cannot be stored")
+
+        array = np.ascontiguousarray(array)
+        entries[name] = {"dtype": array.dtype.str, "shape": array.shape, "offset": offset}
+        contiguous.append(array)
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({"kind": kind, "arrays": entries}).encode()
+    data_start = _aligned(_PREFIX_SIZE + len(header))
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.array([VERSION, len(header)], dtype="<u4").tobytes())
+        file.write(header)
+
+        for entry, array in zip(entries.values(), contiguous, strict=True):
+            file.seek(data_start + int(entry["offset"]))  # type: ignore
+            file.write(array.tobytes())
+
+        file.truncate(data_start + offset)
+
+
+def load_arrays(path: Path | str, kind: str, mmap: bool = True) -> dict[str, np.ndarray]:
+    """
+    Read arrays written by `save_arrays`.
+
+    Args:
+        path: File to read
+        kind: Model expected in the file
+        mmap: Map arrays read-only from the file instead of reading them into memory;
+            processes mapping the same file share its pages
+    """
+    with open(path, "rb") as file:
+        prefix = file.read(_PREFIX_SIZE)
+        if prefix[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a model file")
+
+        version, header_size = np.frombuffer(prefix[len(MAGIC) :], dtype="<u4")
+        if version != VERSION:
+            raise ValueError(f"Unsupported model file version {version}, expected {VERSION}")
+
+        header = json.loads(file.read(int(header_size)))
+
+    if header["kind"] != kind:
+        raise ValueError(f"{path} stores a {header['kind']} model, expected {kind}")
+
+    data_start = _aligned(_PREFIX_SIZE + int(header_size))
+    arrays: dict[str, np.ndarray] = {}
+    for name, entry in header["arrays"].items():
+        dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+        offset = data_start + entry["offset"]
+
+        if mmap and dtype.itemsize * int(np.prod(shape)) > 0:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        else:
+            arrays[name] = np.fromfile(
+                path, dtype=dtype, count=int(np.prod(shape)), offset=offset
+            ).reshape(shape)
+
+    return arrays
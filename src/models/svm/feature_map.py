@@ -0,0 +1,124 @@
+from dataclasses import dataclass, fields
+from typing import Literal
+
+import numpy as np
+
+type FeatureMapName = Literal["none", "fourier", "nystroem"]
+
+
+@dataclass
+class FourierFeatures:
+    """
+    Random Fourier features of the RBF kernel exp(-gamma |x - x'|^2) (Rahimi & Recht, 2007).
+
+    Attributes:
+        mean: Feature mean of the samples the map was drawn on
+        scale: Feature standard deviation of those samples
+        weights: Random frequencies, (n_features, n_components)
+        offset: Random phases, (n_components,)
+    """
+
+    mean: np.ndarray
+    scale: np.ndarray
+    weights: np.ndarray
+    offset: np.ndarray
+
+    @classmethod
+    def draw(
+        cls, X: np.ndarray, n_components: int, gamma: float, rng: np.random.Generator
+    ) -> "FourierFeatures":
+        mean, scale = _standardization(X)
+        weights = rng.normal(scale=np.sqrt(2 * gamma), size=(X.shape[1], n_components))
+        offset = rng.uniform(0, 2 * np.pi, size=n_components)
+
+        return cls(mean, scale, weights, offset)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        projection = ((X - self.mean) / self.scale) @ self.weights + self.offset
+        return np.sqrt(2 / self.offset.size) * np.cos(projection)
+
+
+@dataclass
+class NystroemFeatures:
+    """
+    Nyström approximation of the RBF kernel exp(-gamma |x - x'|^2) on sampled landmarks.
+
+    Attributes:
+        mean: Feature mean of the samples the landmarks were drawn from
+        scale: Feature standard deviation of those samples divided by sqrt(gamma), so the
+            kernel is exp(-|x - x'|^2) on scaled samples
+        landmarks: Scaled landmark samples, (n_components, n_features)
+        normalization: Inverse square root of the kernel between landmarks
+    """
+
+    mean: np.ndarray
+    scale: np.ndarray
+    landmarks: np.ndarray
+    normalization: np.ndarray
+
+    @classmethod
+    def draw(
+        cls, X: np.ndarray, n_components: int, gamma: float, rng: np.random.Generator
+    ) -> "NystroemFeatures":
+        mean, scale = _standardization(X)
+        scale = scale / np.sqrt(gamma)
+
+        drawn = rng.choice(X.shape[0], min(n_components, X.shape[0]), replace=False)
+        landmarks = (X[drawn] - mean) / scale
+
+        eigenvalues, eigenvectors = np.linalg.eigh(_rbf_kernel(landmarks, landmarks))
+        eigenvalues = np.maximum(eigenvalues, 1e-12)
+        normalization = (eigenvectors / np.sqrt(eigenvalues)) @ eigenvectors.T
+
+        return cls(mean, scale, landmarks, normalization)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return _rbf_kernel((X - self.mean) / self.scale, self.landmarks) @ self.normalization
+
+
+type FeatureMap = FourierFeatures | NystroemFeatures
+
+_FEATURE_MAPS: dict[str, type[FeatureMap]] = {
+    "fourier": FourierFeatures,
+    "nystroem": NystroemFeatures,
+}
+
+
+def draw_feature_map(
+    name: FeatureMapName, X: np.ndarray, n_components: int, gamma: float, rng: np.random.Generator
+) -> FeatureMap | None:
+    """Feature map `name` fit to the samples X, None for "none"."""
+    if name == "none":
+        return None
+
+    return _FEATURE_MAPS[name].draw(X, n_components, gamma, rng)
+
+
+def feature_map_arrays(feature_map: FeatureMap) -> dict[str, np.ndarray]:
+    """Arrays describing `feature_map`, restored by `load_feature_map`."""
+    name = next(key for key, value in _FEATURE_MAPS.items() if isinstance(feature_map, value))
+    arrays = {"feature_map": np.array([name])}
+    for field in fields(feature_map):
+        arrays[f"feature_map_{field.name}"] = getattr(feature_map, field.name)
+
+    return arrays
+
+
+def load_feature_map(arrays: dict[str, np.ndarray]) -> FeatureMap | None:
+    if "feature_map" not in arrays:
+        return None
+
+    feature_map = _FEATURE_MAPS[str(arrays["feature_map"][0])]
+    return feature_map(
+        **{field.name: arrays[f"feature_map_{field.name}"] for field in fields(feature_map)}
+    )
+
+
+def _standardization(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    std = X.std(axis=0)
+    return X.mean(axis=0), np.where(std == 0, 1.0, std)
+
+
+def _rbf_kernel(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    distances = (X**2).sum(axis=1)[:, np.newaxis] + (Y**2).sum(axis=1) - 2 * X @ Y.T
+    return np.exp(-np.maximum(distances, 0))
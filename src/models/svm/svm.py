@@ -1,11 +1,20 @@
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
 import numpy as np
 from scipy.optimize import minimize
 from scipy.special import expit
 
 from src.config.base import register_config
+from src.models.serialization import load_arrays, save_arrays
+from src.models.svm.feature_map import (
+    FeatureMap,
+    FeatureMapName,
+    draw_feature_map,
+    feature_map_arrays,
+    load_feature_map,
+)
 
 if TYPE_CHECKING:
     from src.models.classifier import ClassifierName
@@ -17,6 +26,20 @@ class SVMConfig:
     learning_rate: float = 0.1
     penalty: float = 100  # C param
     iter_count: int = 1000
+    batch_size: int = 1  # samples per Pegasos update, 1 updates after every sample
+    tol: float | None = None  # stop once the objective improves less than this, all epochs if None
+    n_iter_no_change: int = 5  # epochs without improvement before stopping
+    average: bool = False  # Polyak averaging, return the mean of all iterates
+    warm_start: bool = False  # update() resumes from the previous fit instead of refitting
+    # "dual_cd" is liblinear's dual coordinate descent, iter_count bounds its passes and tol
+    # its projected gradient gap; batch_size and average only apply to "pegasos"
+    solver: Literal["pegasos", "dual_cd"] = "pegasos"
+    loss: Literal["hinge", "squared_hinge"] = "hinge"  # L1 or L2 loss, pegasos only uses hinge
+    # approximate RBF kernel, the solver trains on n_components random Fourier features or
+    # Nystroem landmarks drawn at the first fit after set_rng and reused by later refits
+    feature_map: FeatureMapName = "none"
+    n_components: int = 256
+    gamma: float | None = None  # RBF kernel width on standardized features, 1 / n_features if None
 
 
 class SVM:
@@ -29,6 +52,28 @@ class SVM:
         self.learning_rate: float = config.learning_rate
         self.penalty: float = config.penalty
         self.iter_count: int = config.iter_count
+        if config.batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {config.batch_size}")
+        self.batch_size: int = config.batch_size
+        if config.n_iter_no_change < 1:
+            raise ValueError(f"n_iter_no_change must be at least 1, got {config.n_iter_no_change}")
+        self.tol: float | None = config.tol
+        self.n_iter_no_change: int = config.n_iter_no_change
+        self.average: bool = config.average
+        self.warm_start: bool = config.warm_start
+        if config.solver == "pegasos" and config.loss != "hinge":
+            raise ValueError(f"The pegasos solver minimizes the hinge loss, got {config.loss}")
+        self.solver: Literal["pegasos", "dual_cd"] = config.solver
+        self.loss: Literal["hinge", "squared_hinge"] = config.loss
+        if config.n_components < 1:
+            raise ValueError(f"n_components must be at least 1, got {config.n_components}")
+        if config.gamma is not None and config.gamma <= 0:
+            raise ValueError(f"gamma must be positive, got {config.gamma}")
+        self.feature_map_name: FeatureMapName = config.feature_map
+        self.n_components: int = config.n_components
+        self.gamma: float | None = config.gamma
+        self.feature_map: FeatureMap | None = None
+        self.n_epochs: int = 0
         self.w: np.ndarray | None = None
         self.b: float | None = None
         self.platt_a: float | None = None
@@ -36,44 +81,132 @@ class SVM:
         self.feature_mean: np.ndarray | None = None
         self.feature_scale: np.ndarray | None = None
         self.rng: np.random.Generator = np.random.default_rng()
+        # state update() resumes from: mapped training data, Pegasos steps taken or dual variables
+        # and the sum of squared deviations from feature_mean behind feature_scale
+        self._X_train: np.ndarray | None = None
+        self._y_train: np.ndarray | None = None
+        self._step: int = 0
+        self._alpha: np.ndarray | None = None
+        self._feature_m2: np.ndarray | None = None
 
     def set_rng(self, seed: int) -> None:
         self.rng = np.random.default_rng(seed)
+        self.feature_map = None
+
+    @property
+    def incremental(self) -> bool:
+        """Whether update() resumes from the previous fit rather than refitting."""
+        return self.warm_start
+
+    def diagnostics(self) -> dict[str, float]:
+        return {"epochs": float(self.n_epochs)}
 
     def fit(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
-        n_samples, n_features = X_train.shape
+        if self.feature_map is None and self.feature_map_name != "none":
+            gamma = 1 / X_train.shape[1] if self.gamma is None else self.gamma
+            self.feature_map = draw_feature_map(
+                self.feature_map_name, X_train, self.n_components, gamma, self.rng
+            )
+
+        self._fit_features(self._map(X_train), y_train)
+
+    def _fit_features(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        self._X_train = X_train
+        self._y_train = y_train
 
         feature_mean = X_train.mean(axis=0)
-        feature_scale = X_train.std(axis=0)
-        feature_scale = np.where(feature_scale == 0, 1.0, feature_scale)
+        feature_std = X_train.std(axis=0)
+        feature_scale = np.where(feature_std == 0, 1.0, feature_std)
         self.feature_mean = feature_mean
         self.feature_scale = feature_scale
+        self._feature_m2 = feature_std**2 * X_train.shape[0]
         X_scaled = self._standardize(X_train)
 
-        w = np.zeros(n_features)
-        b = 0.0
+        y = np.where(y_train <= 0, -1, 1)
+        if self.solver == "dual_cd":
+            self.w, self.b = self._fit_dual_cd(X_scaled, y, np.zeros(X_train.shape[0]))
+        else:
+            self._step = 0
+            self.w, self.b = self._fit_pegasos(X_scaled, y, np.zeros(X_train.shape[1]), 0.0)
+
+        self._fit_platt_scaling(X_train, y_train, (0.0, 0.0))
+
+    def update(self, X_new: np.ndarray, y_new: np.ndarray) -> None:
+        """
+        Add newly labeled samples and train on every sample labeled so far.
+
+        Without `warm_start` this refits from scratch. With it, the standardization is
+        merged with the new samples (Welford), the previous weights are carried over into
+        the new standardized space and Pegasos and Platt scaling resume from where the last
+        fit stopped, so few epochs reconverge, e.g. with `tol` set. Dual coordinate descent
+        resumes from the previous dual variables, new samples start at zero. Either way the
+        feature map of the first fit is kept.
+        """
+        if self.w is None or self.b is None:
+            self.fit(X_new, y_new)
+            return
+        if self._X_train is None or self._y_train is None:
+            raise ValueError("SVM was loaded without its training data, call fit() first.")
+        if X_new.shape[0] == 0:
+            return
+
+        X_new = self._map(X_new)
+        X_train = np.concatenate((self._X_train, X_new))
+        y_train = np.concatenate((self._y_train, y_new))
+        if not self.warm_start:
+            self._fit_features(X_train, y_train)
+            return
+
+        self._X_train, self._y_train = X_train, y_train
+        assert self.feature_mean is not None and self.feature_scale is not None
+        previous_mean, previous_scale = self.feature_mean, self.feature_scale
+        self._merge_standardization(X_new, X_train.shape[0] - X_new.shape[0])
 
         y = np.where(y_train <= 0, -1, 1)
-        lambda_param = 1.0 / (self.penalty * n_samples)
-        step = 0
+        if self.solver == "dual_cd":
+            assert self._alpha is not None
+            alpha = np.concatenate((self._alpha, np.zeros(X_new.shape[0])))
+            self.w, self.b = self._fit_dual_cd(self._standardize(X_train), y, alpha)
+        else:
+            # same decision function in the new standardized space
+            w = self.w * self.feature_scale / previous_scale
+            b = self.b + float(np.dot(self.w, (self.feature_mean - previous_mean) / previous_scale))
+            self.w, self.b = self._fit_pegasos(self._standardize(X_train), y, w, b)
 
-        for _ in range(self.iter_count):
-            for idx in self.rng.permutation(n_samples):
-                step += 1
-                x_i = X_scaled[idx]
-                condition = y[idx] * (np.dot(x_i, w) + b) >= 1
-                eta = self.learning_rate / (1.0 + self.learning_rate * lambda_param * step)
+        assert self.platt_a is not None and self.platt_b is not None
+        self._fit_platt_scaling(X_train, y_train, (self.platt_a, self.platt_b))
 
-                if condition:
-                    w = (1 - eta * lambda_param) * w
-                else:
-                    w = (1 - eta * lambda_param) * w + eta * y[idx] * x_i
-                    b += eta * y[idx]
+    def save(self, path: Path | str) -> None:
+        """Store weights, standardization, Platt parameters and feature map in one file."""
+        if self.w is None or self.b is None or self.platt_a is None or self.platt_b is None:
+            raise ValueError("Model not trained. Call fit() first.")
+        if self.feature_mean is None or self.feature_scale is None:
+            raise ValueError("Model not trained. Call fit() first.")
+
+        arrays = {
+            "w": self.w,
+            "feature_mean": self.feature_mean,
+            "feature_scale": self.feature_scale,
+            "intercepts": np.array([self.b, self.platt_a, self.platt_b]),
+        }
+        if self.feature_map is not None:
+            arrays |= feature_map_arrays(self.feature_map)
 
-        self.w = w
-        self.b = b
+        save_arrays(path, "svm", arrays)
 
-        self._fit_platt_scaling(X_train, y_train)
+    @classmethod
+    def load(cls, path: Path | str, config: SVMConfig | None = None, mmap: bool = True) -> "SVM":
+        """Load an SVM stored by `save`, with `mmap` its arrays are read-only file views."""
+        arrays = load_arrays(path, "svm", mmap)
+
+        svm = cls(config)
+        svm.w = arrays["w"]
+        svm.feature_mean = arrays["feature_mean"]
+        svm.feature_scale = arrays["feature_scale"]
+        svm.b, svm.platt_a, svm.platt_b = (float(value) for value in arrays["intercepts"])
+        svm.feature_map = load_feature_map(arrays)
+
+        return svm
 
     def predict(self, X: np.ndarray) -> np.ndarray:
         pred = np.sign(self._decision_function(X))
@@ -88,14 +221,179 @@ class SVM:
         proba_class_0 = 1 - proba_class_1
         return np.column_stack([proba_class_0, proba_class_1])
 
+    def _fit_pegasos(
+        self, X: np.ndarray, y: np.ndarray, w: np.ndarray, b: float
+    ) -> tuple[np.ndarray, float]:
+        """
+        Pegasos on the hinge loss, one update per `batch_size` samples.
+
+        A batch computes its margins with one matrix-vector product and takes the summed
+        subgradient of its samples, i.e. their mean subgradient scaled by the batch size,
+        while the step counter advances per sample. An epoch thus moves as far as one of
+        per-sample updates with the same learning-rate schedule.
+
+        With `average` the running mean of the iterates after every update is returned.
+        With `tol` the regularized objective of the returned weights is evaluated after
+        every epoch, training stops once it has not dropped below its best value minus
+        `tol` for `n_iter_no_change` epochs in a row.
+
+        Training starts from `w`, `b` and the step counter left by the previous call.
+        """
+        n_samples, n_features = X.shape
+        w_average = np.zeros(n_features)
+        b_average = 0.0
+
+        lambda_param = 1.0 / (self.penalty * n_samples)
+        step = self._step
+        n_updates = 0
+        best_objective = np.inf
+        n_no_change = 0
+
+        self.n_epochs = 0
+        for _ in range(self.iter_count):
+            order = self.rng.permutation(n_samples)
+            for start in range(0, n_samples, self.batch_size):
+                batch = order[start : start + self.batch_size]
+                step += batch.size
+                eta = self.learning_rate / (1.0 + self.learning_rate * lambda_param * step)
+
+                X_batch, y_batch = X[batch], y[batch]
+                violated = y_batch * (X_batch @ w + b) < 1
+
+                w = (1 - eta * lambda_param * batch.size) * w
+                if np.any(violated):
+                    w += eta * (y_batch[violated] @ X_batch[violated])
+                    b += eta * y_batch[violated].sum()
+
+                if self.average:
+                    n_updates += 1
+                    w_average += (w - w_average) / n_updates
+                    b_average += (b - b_average) / n_updates
+
+            self.n_epochs += 1
+            if self.tol is None:
+                continue
+
+            current = (w_average, b_average) if self.average else (w, b)
+            objective = _objective(X, y, *current, self.penalty)
+            if objective < best_objective - self.tol:
+                n_no_change = 0
+            else:
+                n_no_change += 1
+            best_objective = min(best_objective, objective)
+
+            if n_no_change >= self.n_iter_no_change:
+                break
+
+        self._step = step
+        if self.average:
+            return w_average, float(b_average)
+        return w, float(b)
+
+    def _fit_dual_cd(
+        self, X: np.ndarray, y: np.ndarray, alpha: np.ndarray
+    ) -> tuple[np.ndarray, float]:
+        """
+        Dual coordinate descent for the L1- or L2-loss linear SVM (Hsieh et al., 2008).
+
+        Minimizes 1/2 |w|^2 + penalty * sum of losses, the Pegasos objective scaled, over
+        the dual variables one at a time in a closed-form step, with w = sum alpha y x kept
+        up to date. As in liblinear the bias is a regularized weight of a constant feature
+        and variables stuck at a bound are shrunk out of later passes; once the projected
+        gradient gap drops below `tol` on the shrunk set, a full pass confirms convergence.
+
+        Args:
+            X: Standardized samples
+            y: Labels in {-1, 1}
+            alpha: Initial dual variables, updated in place
+        """
+        n_samples = int(X.shape[0])
+        X_bias = np.column_stack((X, np.ones(n_samples)))
+        if self.loss == "hinge":
+            upper, diagonal = self.penalty, 0.0
+        else:
+            upper, diagonal = np.inf, 1 / (2 * self.penalty)
+
+        # diagonal of the dual Hessian, every step divides by one of its entries
+        q_diagonal = np.einsum("ij,ij->i", X_bias, X_bias) + diagonal
+        w = (alpha * y) @ X_bias
+        tol = 1e-4 if self.tol is None else self.tol
+
+        active = np.arange(n_samples)
+        gradient_max_bound, gradient_min_bound = np.inf, -np.inf
+        self.n_epochs = 0
+        for _ in range(self.iter_count):
+            self.n_epochs += 1
+            order = self.rng.permutation(active)
+            keep = np.ones(order.size, dtype=bool)
+            gradient_max, gradient_min = -np.inf, np.inf
+
+            for position, i in enumerate(order):
+                gradient = y[i] * float(X_bias[i] @ w) - 1 + diagonal * alpha[i]
+
+                projected = gradient
+                if alpha[i] == 0:
+                    if gradient > gradient_max_bound:
+                        keep[position] = False
+                        continue
+                    projected = min(gradient, 0.0)
+                elif alpha[i] == upper:
+                    if gradient < gradient_min_bound:
+                        keep[position] = False
+                        continue
+                    projected = max(gradient, 0.0)
+
+                gradient_max = max(gradient_max, projected)
+                gradient_min = min(gradient_min, projected)
+                if abs(projected) > 1e-12:
+                    previous = alpha[i]
+                    alpha[i] = min(max(previous - gradient / q_diagonal[i], 0.0), upper)
+                    w += (alpha[i] - previous) * y[i] * X_bias[i]
+
+            active = order[keep]
+            if gradient_max - gradient_min <= tol:
+                if active.size == n_samples:
+                    break
+                active = np.arange(n_samples)
+                gradient_max_bound, gradient_min_bound = np.inf, -np.inf
+                continue
+
+            gradient_max_bound = gradient_max if gradient_max > 0 else np.inf
+            gradient_min_bound = gradient_min if gradient_min < 0 else -np.inf
+
+        self._alpha = alpha
+        return w[:-1], float(w[-1])
+
+    def _merge_standardization(self, X_new: np.ndarray, n_previous: int) -> None:
+        """Fold the mean and variance of new samples into the previous ones (Chan et al.)."""
+        assert self.feature_mean is not None and self._feature_m2 is not None
+        n_new = X_new.shape[0]
+        n_samples = n_previous + n_new
+
+        new_mean = X_new.mean(axis=0)
+        delta = new_mean - self.feature_mean
+        self.feature_mean = self.feature_mean + delta * n_new / n_samples
+        self._feature_m2 = (
+            self._feature_m2
+            + ((X_new - new_mean) ** 2).sum(axis=0)
+            + delta**2 * n_previous * n_new / n_samples
+        )
+
+        feature_std = np.sqrt(self._feature_m2 / n_samples)
+        self.feature_scale = np.where(feature_std == 0, 1.0, feature_std)
+
     def _standardize(self, X: np.ndarray) -> np.ndarray:
         if self.feature_mean is None or self.feature_scale is None:
             raise ValueError("Model not trained. Call fit() first.")
 
         return (X - self.feature_mean) / self.feature_scale
 
-    def _fit_platt_scaling(self, X: np.ndarray, Y: np.ndarray) -> None:
-        decision_values = self._decision_function(X)
+    def _map(self, X: np.ndarray) -> np.ndarray:
+        return X if self.feature_map is None else self.feature_map.transform(X)
+
+    def _fit_platt_scaling(self, X: np.ndarray, Y: np.ndarray, x0: tuple[float, float]) -> None:
+        """Fit Platt scaling on mapped samples X."""
+        decision_values = self._linear_decision(X)
 
         y_binary = np.where(Y <= 0, 0, 1).flatten()
 
@@ -113,12 +411,21 @@ class SVM:
             nll = -np.sum(targets * np.log(pred_proba) + (1 - targets) * np.log(1 - pred_proba))
             return nll
 
-        result = minimize(neg_log_likelihood, x0=[0.0, 0.0], method="BFGS")
+        result = minimize(neg_log_likelihood, x0=list(x0), method="BFGS")
         self.platt_a, self.platt_b = result.x
 
     def _decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self._linear_decision(self._map(X))
+
+    def _linear_decision(self, X: np.ndarray) -> np.ndarray:
         if self.w is None or self.b is None:
             raise ValueError("Model not trained. Call fit() first.")
 
         X_scaled = self._standardize(X)
         return np.dot(X_scaled, self.w) + self.b
+
+
+def _objective(X: np.ndarray, y: np.ndarray, w: np.ndarray, b: float, penalty: float) -> float:
+    """Regularized mean hinge loss Pegasos minimizes, lambda = 1 / (penalty * n_samples)."""
+    hinge = np.maximum(0, 1 - y * (X @ w + b))
+    return float(w @ w / (2 * penalty) + hinge.sum()) / X.shape[0]
@@ -4,18 +4,26 @@ from typing import cast
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier,
+)
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 from sklearn.model_selection import train_test_split
 from sklearn.svm import LinearSVC
 
 from src.config import ConfigParser, register_config
+from src.models.boosting.boosting import GradientBoostingConfig
 from src.models.classifier import CLASSIFIERS, Classifier, ClassifierName, resolve_classifier
 from src.models.forest.forest import RandomForestConfig
 from src.models.svm.svm import SVMConfig
 
 type Results = dict[str, dict[str, list[float]]]
 
+# classifiers resolve_sklearn_classifier has a counterpart for
+SKLEARN_CLASSIFIERS = [name for name in CLASSIFIERS if name != "mondrian"]
+
 
 @register_config(name="aggregator")
 @dataclass
@@ -88,17 +96,50 @@ def resolve_sklearn_classifier(
     match classifier:
         case "svm":
             svm_config = config_parser.get(SVMConfig)
-            return cast(Classifier, LinearSVC(C=svm_config.penalty, max_iter=svm_config.iter_count))
+            return cast(
+                Classifier,
+                LinearSVC(
+                    C=svm_config.penalty, loss=svm_config.loss, max_iter=svm_config.iter_count
+                ),
+            )
         case "forest":
             forest_config = config_parser.get(RandomForestConfig)
+            tree_config = forest_config.tree_config
+            # our forests bootstrap with either splitter
+            forest_class = (
+                ExtraTreesClassifier if tree_config.splitter == "random" else RandomForestClassifier
+            )
             return cast(
                 Classifier,
-                RandomForestClassifier(
+                forest_class(
                     random_state=seed,
                     n_estimators=forest_config.n_trees,
                     criterion="gini",
-                    max_features="sqrt",
-                    max_depth=forest_config.tree_config.max_depth,
-                    min_samples_split=forest_config.tree_config.min_samples_split,
+                    bootstrap=True,
+                    max_features=tree_config.max_features or "sqrt",
+                    max_depth=tree_config.max_depth,
+                    min_samples_split=tree_config.min_samples_split,
+                ),
+            )
+        case "boosting":
+            boosting_config = config_parser.get(GradientBoostingConfig)
+            return cast(
+                Classifier,
+                HistGradientBoostingClassifier(
+                    random_state=seed,
+                    max_iter=boosting_config.max_iter,
+                    learning_rate=boosting_config.learning_rate,
+                    max_leaf_nodes=boosting_config.max_leaf_nodes,
+                    max_depth=boosting_config.max_depth,
+                    min_samples_leaf=boosting_config.min_samples_leaf,
+                    l2_regularization=boosting_config.l2_regularization,
+                    # sklearn keeps one more bin for missing values
+                    max_bins=min(boosting_config.max_bins, 255),
+                    early_stopping=boosting_config.early_stopping,
+                    validation_fraction=boosting_config.validation_fraction,
+                    n_iter_no_change=boosting_config.n_iter_no_change,
+                    tol=boosting_config.tol,
                 ),
             )
+        case "mondrian":
+            raise ValueError("sklearn has no Mondrian forest to compare with")
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.active_learning.learner import ActiveLearner, ActiveLearnerConfig, LearningData
+from src.models.classifier import Classifier
+from src.models.forest.forest import RandomForest, RandomForestConfig
+from src.models.svm.svm import SVM, SVMConfig
+
+
+class RecordingForest(RandomForest):
+    def __init__(self, config: RandomForestConfig) -> None:
+        super().__init__(config)
+        self.calls: list[str] = []
+
+    def fit(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        self.calls.append("fit")
+        super().fit(X_train, y_train)
+
+    def update(self, X_new: np.ndarray, y_new: np.ndarray) -> None:
+        self.calls.append("update")
+        super().update(X_new, y_new)
+
+
+def run_learner(classifier: Classifier) -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 4))
+    y = (X[:, 0] > 0).astype(int)
+    labeled_mask = np.zeros(60, dtype=bool)
+    labeled_mask[:20] = True
+
+    classifier.set_rng(0)
+    config = ActiveLearnerConfig(classifier=classifier, batch_size=10, should_store_results=False)
+    ActiveLearner(config, LearningData(X, y, labeled_mask)).loop(X[:10], y[:10])
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    [
+        (RandomForestConfig(n_trees=3), "fit"),
+        (RandomForestConfig(n_trees=3, refit_fraction=0.5), "update"),
+        (RandomForestConfig(n_trees=3, min_trees=1), "update"),
+    ],
+)
+def test_only_incremental_forests_are_updated(config: RandomForestConfig, expected: str):
+    forest = RecordingForest(config)
+    run_learner(forest)
+
+    assert forest.calls == ["fit"] + [expected] * 5
+
+
+class RecordingSVM(SVM):
+    def __init__(self, config: SVMConfig) -> None:
+        super().__init__(config)
+        self.calls: list[str] = []
+
+    def fit(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        self.calls.append("fit")
+        super().fit(X_train, y_train)
+
+    def update(self, X_new: np.ndarray, y_new: np.ndarray) -> None:
+        self.calls.append("update")
+        super().update(X_new, y_new)
+
+
+@pytest.mark.parametrize(("warm_start", "expected"), [(False, "fit"), (True, "update")])
+def test_only_warm_started_svms_are_updated(warm_start: bool, expected: str):
+    svm = RecordingSVM(SVMConfig(iter_count=2, warm_start=warm_start))
+    run_learner(svm)
+
+    assert svm.calls == ["fit"] + [expected] * 5
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.active_learning.learner import ActiveLearnerConfig, ExperimentResults
+from src.active_learning.tester import LearnerTester
+from src.active_learning.tester import TesterConfig as LearnerTesterConfig  # not a test class
+from src.models.forest.forest import RandomForest, RandomForestConfig
+
+
+def test_diagnostics_are_averaged_per_iteration(tmp_path: Path):
+    tester = LearnerTester(
+        ActiveLearnerConfig(classifier=RandomForest(RandomForestConfig(n_trees=3))),
+        LearnerTesterConfig(save_dir=str(tmp_path)),
+    )
+    proba = np.zeros((2, 1))
+    trials = [
+        ExperimentResults([0.25, 0.5], np.zeros(1), proba, [{"a": 1.0}, {"a": 2.0, "b": 4.0}]),
+        ExperimentResults([0.25, 0.5], np.zeros(1), proba, [{"a": 3.0}, {"a": 6.0}]),
+    ]
+
+    tester._save_diagnostics(trials)  # pyright: ignore
+    data = np.genfromtxt(tmp_path / "diagnostics.csv", delimiter=",", names=True)
+
+    assert data.dtype.names == ("labeled_ratio", "a", "b")
+    assert np.array_equal(data["a"], [2.0, 4.0])
+    assert np.isnan(data["b"][0]) and data["b"][1] == 4.0
@@ -0,0 +1,110 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+from scipy.special import expit
+
+from src.models.boosting.boosting import (
+    GradientBoosting,
+    GradientBoostingConfig,
+    _histogram,  # pyright: ignore
+)
+from src.models.forest.binning import bin_features
+
+if TYPE_CHECKING:
+    from tests.conftest import DatasetFactory, SeededFit
+
+
+def nonlinear_score(X: np.ndarray) -> np.ndarray:
+    return X[:, 0] + X[:, 1] ** 2 - 0.5
+
+
+def test_fits_nonlinear_data(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(0, 300, 6, score=nonlinear_score)
+    X_test, y_test = make_dataset(1, 300, 6, score=nonlinear_score)
+    model = fit_seeded(GradientBoosting(GradientBoostingConfig(early_stopping=False)), X, y)
+
+    proba = model.predict_proba(X_test)
+    assert model.n_iter == 100
+    assert np.allclose(proba.sum(axis=1), 1)
+    assert np.mean(model.predict(X_test) == y_test) > 0.9
+
+
+def test_single_round_is_a_newton_step(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(2, 300, 6, score=nonlinear_score)
+    config = GradientBoostingConfig(
+        max_iter=1, learning_rate=1.0, max_leaf_nodes=2, early_stopping=False
+    )
+    model = fit_seeded(GradientBoosting(config), X, y)
+
+    raw = model.decision_function(X)
+    baseline = np.log(y.mean() / (1 - y.mean()))
+    proba = expit(baseline)
+    for value in np.unique(raw):
+        side = raw == value
+        gradient, hessian = np.sum(proba - y[side]), side.sum() * proba * (1 - proba)
+        assert np.isclose(value, baseline - gradient / hessian)
+        assert side.sum() >= config.min_samples_leaf
+
+
+def test_early_stopping(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(3, 300, 6, score=nonlinear_score)
+    stopped = fit_seeded(
+        GradientBoosting(GradientBoostingConfig(max_iter=500, learning_rate=0.5)), X, y
+    )
+
+    assert stopped.n_iter < 500
+    assert stopped.diagnostics() == {"n_iter": stopped.n_iter}
+
+
+def test_max_leaf_nodes(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(4, 300, 6, score=nonlinear_score)
+    model = fit_seeded(GradientBoosting(GradientBoostingConfig(max_iter=5, max_leaf_nodes=4)), X, y)
+
+    for tree in model._trees:  # pyright: ignore
+        assert np.count_nonzero(tree.feature < 0) <= 4
+
+
+def test_sibling_histograms_subtract(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(5, 300, 6, score=nonlinear_score)
+    binned = bin_features(X, 32)
+    rng = np.random.default_rng(0)
+    gradients, hessians = rng.normal(size=y.size), rng.random(y.size)
+
+    samples = np.arange(y.size)
+    left = samples[X[:, 0] < 0]
+    right = samples[X[:, 0] >= 0]
+
+    parent = _histogram(binned, gradients, hessians, samples)
+    assert np.allclose(
+        parent - _histogram(binned, gradients, hessians, left),
+        _histogram(binned, gradients, hessians, right),
+    )
+    assert np.allclose(parent[:, 0].sum(axis=1), [gradients.sum(), hessians.sum(), y.size])
+
+
+def test_single_class(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, _ = make_dataset(6, 300, 6, score=nonlinear_score)
+    model = fit_seeded(GradientBoosting(GradientBoostingConfig()), X, np.ones(X.shape[0]))
+
+    assert np.array_equal(model.predict(X), np.ones(X.shape[0]))
+    assert model.predict_proba(X).shape == (X.shape[0], 1)
+
+
+def test_multiclass_is_rejected(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, _ = make_dataset(7, 300, 6, score=nonlinear_score)
+    with pytest.raises(ValueError):
+        fit_seeded(GradientBoosting(GradientBoostingConfig()), X, np.arange(X.shape[0]) % 3)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        GradientBoostingConfig(max_bins=1),
+        GradientBoostingConfig(max_leaf_nodes=1),
+        GradientBoostingConfig(validation_fraction=1.0),
+    ],
+)
+def test_invalid_config(config: GradientBoostingConfig):
+    with pytest.raises(ValueError):
+        GradientBoosting(config)
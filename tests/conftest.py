@@ -0,0 +1,61 @@
+from collections.abc import Callable
+from typing import Protocol
+
+import numpy as np
+import pytest
+
+from src.models.classifier import Classifier
+
+type Score = Callable[[np.ndarray], np.ndarray]
+
+
+class DatasetFactory(Protocol):
+    def __call__(
+        self,
+        seed: int,
+        n_samples: int = 150,
+        n_features: int = 4,
+        *,
+        noise: float = 0.0,
+        score: Score | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]: ...
+
+
+class SeededFit(Protocol):
+    def __call__[C: Classifier](self, model: C, X: np.ndarray, y: np.ndarray) -> C: ...
+
+
+def _make_dataset(
+    seed: int,
+    n_samples: int = 150,
+    n_features: int = 4,
+    *,
+    noise: float = 0.0,
+    score: Score | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, n_features))
+
+    scores = X[:, 0] + X[:, 1] if score is None else score(X)
+    if noise > 0:
+        scores = scores + rng.normal(scale=noise, size=n_samples)
+
+    return X, (scores > 0).astype(int)
+
+
+def _fit_seeded[C: Classifier](model: C, X: np.ndarray, y: np.ndarray) -> C:
+    model.set_rng(0)
+    model.fit(X, y)
+    return model
+
+
+@pytest.fixture
+def make_dataset() -> DatasetFactory:
+    """Normal samples labeled by the sign of `score`, the sum of their first two features."""
+    return _make_dataset
+
+
+@pytest.fixture
+def fit_seeded() -> SeededFit:
+    """Fit a model seeded with 0, so every run grows the same model."""
+    return _fit_seeded
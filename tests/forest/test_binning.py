@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from src.models.forest.binning import bin_features
+from src.models.forest.cart import CART, CARTConfig, _TrainingData  # pyright: ignore
+from src.models.forest.forest import RandomForest, RandomForestConfig
+
+
+def test_codes_respect_edges():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 3))
+
+    binned = bin_features(X, 16)
+
+    assert binned.codes.dtype == np.uint8
+    assert binned.codes.max() < 16
+    for feature_index in range(3):
+        codes = binned.codes[:, feature_index]
+        edges = binned.edges[feature_index]
+        for bin_index in range(15):
+            assert np.array_equal(codes <= bin_index, X[:, feature_index] < edges[bin_index])
+
+
+def test_few_distinct_values_are_not_merged():
+    X = np.array([[0.0], [1.0], [1.0], [3.0]])
+
+    binned = bin_features(X, 8)
+
+    assert np.array_equal(binned.codes[:, 0], [0, 1, 1, 2])
+    assert np.array_equal(binned.edges[0, :2], [0.5, 2.0])
+
+
+def test_feature_subset_matches_full_binning():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    features = np.array([4, 1])
+
+    full = bin_features(X, 32)
+    subset = bin_features(X, 32, features)
+
+    assert np.array_equal(subset.codes[:, features], full.codes[:, features])
+    assert np.array_equal(subset.edges[features], full.edges[features])
+    assert not subset.codes[:, [0, 2, 3, 5]].any()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_code_split_matches_histogram_split(seed: int):
+    rng = np.random.default_rng(seed)
+    X = np.round(rng.normal(size=(200, 8)), 1)
+    y = rng.integers(0, 3, size=200)
+    weights = rng.integers(0, 3, size=200)
+    data = _TrainingData(X, y, weights, np.arange(8), 3, bin_features(X, 16))
+
+    cart = CART(CARTConfig(max_bins=16))
+    samples = np.flatnonzero(weights)[:40]
+    histogram = cart._histogram(data, samples)  # pyright: ignore
+    expected = cart._find_best_histogram_split(histogram)  # pyright: ignore
+
+    split = cart._find_best_code_split(data, samples)  # pyright: ignore
+    assert split is not None and split == expected
+
+
+@pytest.mark.parametrize("max_bins", [1, 257])
+def test_invalid_bin_count(max_bins: int):
+    with pytest.raises(ValueError):
+        CART(CARTConfig(max_bins=max_bins))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_histogram_tree_matches_exact_on_few_values(seed: int):
+    rng = np.random.default_rng(seed)
+    X = np.round(rng.normal(size=(200, 5)), 1)
+    y = (X[:, 0] + rng.normal(size=200) > 0).astype(int)
+
+    exact = CART(CARTConfig(max_depth=6))
+    exact.fit(X, y)
+    histogram = CART(CARTConfig(max_depth=6, max_bins=256))
+    histogram.fit(X, y)
+
+    assert np.array_equal(histogram.tree.feature, exact.tree.feature)
+    assert np.array_equal(histogram.predict_proba(X), exact.predict_proba(X))
+
+
+def test_histogram_forest_accuracy_close_to_exact():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 4))
+    y = (X[:, 0] - X[:, 1] > 0).astype(int)
+    X_test = rng.normal(size=(300, 4))
+    y_test = (X_test[:, 0] - X_test[:, 1] > 0).astype(int)
+
+    accuracies = []
+    for max_bins in [None, 32]:
+        forest = RandomForest(RandomForestConfig(CARTConfig(max_bins=max_bins), n_trees=20))
+        forest.set_rng(0)
+        forest.fit(X, y)
+        accuracies.append(np.mean(forest.predict(X_test) == y_test))
+
+    assert accuracies[1] > 0.8
+    assert abs(accuracies[0] - accuracies[1]) < 0.05
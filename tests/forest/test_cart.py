@@ -0,0 +1,367 @@
+import numpy as np
+import pytest
+
+from src.models.forest.cart import (
+    CART,
+    CARTConfig,
+    DecisionNode,
+    FlatTree,
+    Leaf,
+    MaxFeatures,
+    NodeArrays,
+    _TrainingData,  # pyright: ignore
+    parse_max_features,
+    resolve_max_features,
+)
+from src.models.forest.util import gini_impurity
+
+
+def reference_split(dataset: np.ndarray) -> tuple[int, float] | None:
+    n_samples, n_features = dataset.shape[0], dataset.shape[1] - 1
+    labels = dataset[:, -1].astype(int)
+
+    initial_right = np.bincount(labels)
+    parent_impurity = gini_impurity(initial_right)
+
+    best_gain = -np.inf
+    best_split = None
+
+    for feature_index in range(n_features):
+        feature_column = dataset[:, feature_index]
+        sort_indices = np.argsort(feature_column)
+        features_sorted = feature_column[sort_indices]
+        labels_sorted = labels[sort_indices]
+
+        right_counts = np.copy(initial_right)
+        left_counts = np.zeros_like(right_counts)
+
+        for i in range(n_samples - 1):
+            right_counts[labels_sorted[i]] -= 1
+            left_counts[labels_sorted[i]] += 1
+
+            if features_sorted[i] == features_sorted[i + 1]:
+                continue
+
+            gain = (
+                parent_impurity
+                - (left_counts.sum() / n_samples) * gini_impurity(left_counts)
+                - (right_counts.sum() / n_samples) * gini_impurity(right_counts)
+            )
+
+            if gain > best_gain:
+                best_gain = gain
+                best_split = (feature_index, (features_sorted[i] + features_sorted[i + 1]) / 2)
+
+    return best_split
+
+
+def root_split(X: np.ndarray, y: np.ndarray, n_classes: int) -> tuple[int, float] | None:
+    n_samples, n_features = X.shape
+    data = _TrainingData(
+        X, y, np.ones(n_samples, dtype=np.int64), np.arange(n_features), n_classes, None
+    )
+
+    return CART(CARTConfig())._find_best_split(data, np.argsort(X.T, axis=1))
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_split_matches_reference(seed: int, n_classes: int):
+    rng = np.random.default_rng(seed)
+    X = np.round(rng.normal(size=(60, 5)), 1)
+    y = rng.integers(0, n_classes, size=60)
+    dataset = np.concatenate((X, y[:, np.newaxis]), axis=1)
+
+    split = root_split(X, y, n_classes)
+    expected = reference_split(dataset)
+
+    assert split is not None and split == expected
+
+
+def test_split_on_constant_features_is_none():
+    X = np.array([[1.0, 2.0], [1.0, 2.0], [1.0, 2.0]])
+
+    assert root_split(X, np.array([0, 1, 1]), 2) is None
+
+
+def test_fit_separates_training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(80, 4))
+    y = (X[:, 0] + X[:, 2] > 0).astype(int)
+
+    tree = CART(CARTConfig(max_depth=20))
+    tree.fit(X, y)
+
+    assert np.array_equal(tree.predict(X), y)
+    assert np.allclose(tree.predict_proba(X).sum(axis=1), 1)
+
+
+def walk(node: DecisionNode | Leaf, sample: np.ndarray) -> np.ndarray:
+    while isinstance(node, DecisionNode):
+        node = node.right if sample[node.feature_index] >= node.threshold else node.left
+
+    return node.probabilities
+
+
+def flatten(root: DecisionNode | Leaf) -> FlatTree:
+    builder = NodeArrays()
+
+    stack: list[tuple[DecisionNode | Leaf, int, bool]] = [(root, -1, False)]
+    while stack:
+        node, parent, is_left = stack.pop()
+
+        if isinstance(node, Leaf):
+            builder.add_leaf(parent, is_left, node.probabilities)
+        else:
+            node_id = builder.add_split(parent, is_left, node.feature_index, node.threshold)
+            stack.append((node.right, node_id, False))
+            stack.append((node.left, node_id, True))
+
+    return builder.build()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_flat_tree_matches_node_view(seed: int):
+    rng = np.random.default_rng(seed)
+    X = np.round(rng.normal(size=(100, 4)), 1)
+    y = rng.integers(0, 2, size=100)
+    X_test = np.round(rng.normal(size=(50, 4)), 1)
+
+    tree = CART(CARTConfig(max_depth=6))
+    tree.fit(X, y)
+    root = tree.root
+    expected = np.array([walk(root, sample) for sample in X_test])
+
+    assert np.array_equal(tree.predict_proba(X_test), expected)
+    assert np.array_equal(tree.predict(X_test), np.argmax(expected, axis=1))
+
+
+def test_flat_tree_round_trip():
+    root = DecisionNode(
+        0,
+        0.5,
+        Leaf(np.array([1.0, 0.0])),
+        DecisionNode(1, -1.0, Leaf(np.array([0.2, 0.8])), Leaf(np.array([0.0, 1.0]))),
+    )
+
+    flat = flatten(root)
+
+    assert flat.node_count == 5
+    assert flat.proba.shape == (3, 2)
+    assert repr(flat.to_nodes()) == repr(root)
+
+
+def test_single_leaf_tree():
+    tree = CART(CARTConfig())
+    tree.fit(np.ones((4, 2)), np.array([0, 1, 1, 1]))
+
+    assert isinstance(tree.root, Leaf)
+    assert np.array_equal(tree.predict_proba(np.zeros((3, 2))), np.tile([0.25, 0.75], (3, 1)))
+
+
+def test_presorted_orders_give_same_tree():
+    rng = np.random.default_rng(0)
+    X = np.round(rng.normal(size=(100, 4)), 1)
+    y = rng.integers(0, 2, size=100)
+
+    tree = CART(CARTConfig())
+    tree.fit(X, y)
+    presorted_tree = CART(CARTConfig())
+    presorted_tree.fit(X, y, presorted=np.argsort(-X.T, axis=1)[:, ::-1])
+
+    assert repr(presorted_tree.root) == repr(tree.root)
+
+
+def test_sample_weight_matches_repeated_rows():
+    rng = np.random.default_rng(0)
+    X = np.round(rng.normal(size=(80, 6)), 1)
+    y = rng.integers(0, 2, size=80)
+    samples = rng.choice(80, 80, replace=True)
+    features = np.array([4, 1, 3])
+
+    repeated = CART(CARTConfig())
+    repeated.fit(X[np.ix_(samples, features)], y[samples])
+    weighted = CART(CARTConfig())
+    weighted.fit(X, y, np.bincount(samples, minlength=80), features)
+
+    assert np.array_equal(
+        weighted.tree.feature[weighted.tree.feature >= 0],
+        features[repeated.tree.feature[repeated.tree.feature >= 0]],
+    )
+    assert np.array_equal(weighted.tree.threshold, repeated.tree.threshold, equal_nan=True)
+    assert np.array_equal(weighted.predict_proba(X), repeated.predict_proba(X[:, features]))
+
+
+def test_deep_tree_does_not_recurse():
+    X = np.arange(3000, dtype=float)[:, np.newaxis]
+    y = np.arange(3000) % 2
+
+    tree = CART(CARTConfig(max_depth=5000))
+    tree.fit(X, y)
+
+    assert tree.tree.node_count > 2 * 1000
+    assert np.array_equal(tree.predict(X), y)
+    assert isinstance(tree.root, DecisionNode)
+
+
+def test_labels_are_encoded():
+    X = np.array([[0.0], [1.0], [2.0], [3.0]])
+    y = np.array([3, 3, 7, 7])
+
+    tree = CART(CARTConfig())
+    tree.fit(X, y)
+
+    assert np.array_equal(tree.classes, [3, 7])
+    assert np.array_equal(tree.predict(X), y)
+    assert np.array_equal(tree.predict_proba(X), [[1, 0], [1, 0], [0, 1], [0, 1]])
+
+
+def test_predict_before_fit():
+    with pytest.raises(ValueError):
+        CART(CARTConfig()).predict(np.zeros((1, 1)))
+
+
+def test_random_splitter_separates_training_data():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(80, 4))
+    y = (X[:, 0] + X[:, 2] > 0).astype(int)
+
+    tree = CART(CARTConfig(max_depth=40, splitter="random"), np.random.default_rng(0))
+    tree.fit(X, y)
+
+    assert np.array_equal(tree.predict(X), y)
+
+
+def test_random_splitter_is_seeded():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(60, 3))
+    y = rng.integers(0, 3, size=60)
+
+    trees = [CART(CARTConfig(splitter="random"), np.random.default_rng(7)) for _ in range(2)]
+    for tree in trees:
+        tree.fit(X, y)
+
+    assert repr(trees[0].tree) == repr(trees[1].tree)
+
+
+def test_random_splitter_skips_constant_features():
+    X = np.column_stack((np.ones(6), [0, 0, 0, 1, 1, 1]))
+    y = np.array([0, 0, 0, 1, 1, 1])
+
+    tree = CART(CARTConfig(max_depth=1, splitter="random"), np.random.default_rng(0))
+    tree.fit(X, y)
+
+    assert tree.tree.feature[0] == 1
+    assert np.array_equal(tree.predict(X), y)
+
+
+def test_random_splitter_rejects_bins():
+    with pytest.raises(ValueError):
+        CART(CARTConfig(max_bins=32, splitter="random"))
+
+
+@pytest.mark.parametrize(
+    ("max_features", "expected"),
+    [(None, 64), ("sqrt", 8), ("log2", 6), (5, 5), (100, 64), (0.25, 16), (0.001, 1)],
+)
+def test_resolve_max_features(max_features: MaxFeatures | None, expected: int):
+    assert resolve_max_features(max_features, 64) == expected
+
+
+@pytest.mark.parametrize("max_features", [0, -1, 0.0, 1.5, "all"])
+def test_invalid_max_features(max_features: MaxFeatures):
+    with pytest.raises(ValueError):
+        parse_max_features(max_features, None)  # type: ignore
+    with pytest.raises(ValueError):
+        CART(CARTConfig(max_features=max_features))
+
+
+@pytest.mark.parametrize("max_bins", [None, 16])
+def test_all_features_per_node_matches_default(max_bins: int | None):
+    rng = np.random.default_rng(3)
+    X = np.column_stack((rng.normal(size=(90, 5)), np.ones(90)))
+    y = (X[:, 1] - X[:, 3] > 0).astype(int)
+
+    default = CART(CARTConfig(max_bins=max_bins))
+    default.fit(X, y)
+    per_node = CART(CARTConfig(max_bins=max_bins, max_features=1.0), np.random.default_rng(0))
+    per_node.fit(X, y)
+
+    assert repr(default.tree) == repr(per_node.tree)
+
+
+@pytest.mark.parametrize("max_bins", [None, 16])
+def test_single_feature_per_node(max_bins: int | None):
+    rng = np.random.default_rng(4)
+    X = rng.normal(size=(120, 6))
+    y = (X[:, 0] > 0).astype(int)
+
+    tree = CART(
+        CARTConfig(max_depth=30, max_bins=max_bins, max_features=1), np.random.default_rng(0)
+    )
+    tree.fit(X, y)
+
+    assert np.array_equal(tree.predict(X), y)
+    assert np.unique(tree.tree.feature[tree.tree.feature >= 0]).size > 1
+
+
+def splits(tree: CART) -> set[tuple[int, float]]:
+    flat = tree.tree
+    decision = flat.feature >= 0
+    return set(zip(flat.feature[decision].tolist(), flat.threshold[decision].tolist(), strict=True))
+
+
+@pytest.mark.parametrize("max_bins", [None, 16])
+def test_unbounded_best_first_matches_depth_first(max_bins: int | None):
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(150, 4))
+    y = (X[:, 0] * X[:, 1] > 0).astype(int)
+
+    depth_first = CART(CARTConfig(max_depth=6, max_bins=max_bins))
+    depth_first.fit(X, y)
+    best_first = CART(CARTConfig(max_depth=6, max_bins=max_bins, max_leaf_nodes=1000))
+    best_first.fit(X, y)
+
+    assert best_first.node_count == depth_first.node_count
+    assert splits(best_first) == splits(depth_first)
+    assert np.array_equal(best_first.predict_proba(X), depth_first.predict_proba(X))
+
+
+def test_best_first_trees_are_nested():
+    rng = np.random.default_rng(6)
+    X = rng.normal(size=(150, 4))
+    y = (X[:, 0] + X[:, 1] ** 2 > 1).astype(int)
+
+    previous: set[tuple[int, float]] = set()
+    for max_leaf_nodes in range(2, 12):
+        tree = CART(CARTConfig(max_depth=20, max_leaf_nodes=max_leaf_nodes))
+        tree.fit(X, y)
+
+        assert tree.node_count == 2 * max_leaf_nodes - 1
+        assert previous <= splits(tree)
+        previous = splits(tree)
+
+
+def test_min_impurity_decrease():
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(100, 3))
+    y = (X[:, 0] > 0).astype(int)
+    y[:10] = 1 - y[:10]
+
+    default = CART(CARTConfig())
+    default.fit(X, y)
+    zero = CART(CARTConfig(min_impurity_decrease=0.0))
+    zero.fit(X, y)
+    pruned = CART(CARTConfig(min_impurity_decrease=0.01))
+    pruned.fit(X, y)
+    stump = CART(CARTConfig(min_impurity_decrease=0.5))
+    stump.fit(X, y)
+
+    assert repr(zero.tree) == repr(default.tree)
+    assert 1 < pruned.node_count < default.node_count
+    assert stump.node_count == 1
+
+
+def test_invalid_max_leaf_nodes():
+    with pytest.raises(ValueError):
+        CART(CARTConfig(max_leaf_nodes=1))
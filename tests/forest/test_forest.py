@@ -0,0 +1,292 @@
+import itertools
+import os
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from src.models.forest.cart import CARTConfig
+from src.models.forest.forest import (
+    RandomForest,
+    RandomForestConfig,
+    _bootstrap,  # pyright: ignore
+)
+from src.models.forest.pool import get_pool, pool_size, run_shared, shared_arrays, shutdown_pool
+from src.models.forest.util import majority_vote
+
+if TYPE_CHECKING:
+    from tests.conftest import DatasetFactory, SeededFit
+
+
+def test_aggregation_matches_per_tree_predictions():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(60, 9))
+    y = np.where(X[:, 0] > 0, "a", "b")
+    y[0] = "c"
+
+    forest = RandomForest(RandomForestConfig(n_trees=15))
+    forest.set_rng(0)
+    forest.fit(X, y)
+
+    X_test = rng.normal(size=(40, 9))
+    labels = np.stack([tree.predict(X_test) for tree in forest._trees], axis=1)  # pyright: ignore
+    proba = np.zeros((X_test.shape[0], forest.classes.size))
+    for tree in forest._trees:  # pyright: ignore
+        proba[:, np.searchsorted(forest.classes, tree.classes)] += tree.predict_proba(X_test)
+
+    assert np.array_equal(forest.predict(X_test), np.apply_along_axis(majority_vote, 1, labels))
+    assert np.allclose(forest.predict_proba(X_test), proba / 15)
+
+
+def test_full_update_matches_refit(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(5, 120, 9)
+
+    updated = RandomForest(RandomForestConfig(n_trees=5))
+    updated.set_rng(0)
+    updated.fit(X[:80], y[:80])
+    updated.update(X[80:], y[80:])
+
+    refit = RandomForest(RandomForestConfig(n_trees=5))
+    refit.set_rng(0)
+    refit.fit(X[:80], y[:80])
+    refit.fit(X, y)
+
+    assert np.array_equal(updated.predict_proba(X), refit.predict_proba(X))
+
+
+def test_partial_update_rotates_trees(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(6, 120, 9)
+    forest = RandomForest(RandomForestConfig(n_trees=5, refit_fraction=0.4))
+    forest.set_rng(0)
+    forest.fit(X[:60], y[:60])
+
+    history = [list(forest._trees)]  # pyright: ignore
+    for start in range(60, 120, 20):
+        forest.update(X[start : start + 20], y[start : start + 20])
+        history.append(list(forest._trees))  # pyright: ignore
+
+    changed = [
+        [i for i, (old, new) in enumerate(zip(before, after, strict=True)) if old is not new]
+        for before, after in itertools.pairwise(history)
+    ]
+    assert changed == [[0, 1], [2, 3], [0, 4]]
+
+
+def test_registered_predictions_match_uncached(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(7, 120, 9)
+    forest = RandomForest(RandomForestConfig(n_trees=5, refit_fraction=0.4))
+    forest.set_rng(0)
+    forest.register(X)
+    forest.fit(X[:60], y[:60])
+
+    for start in range(60, 120, 20):
+        cached_leaves = list(forest._caches[0].tree_leaves)  # pyright: ignore
+        forest.update(X[start : start + 20], y[start : start + 20])
+
+        assert np.array_equal(forest.predict_proba(X), forest.predict_proba(X.copy()))
+        assert np.array_equal(forest.predict(X), forest.predict(X.copy()))
+
+        reused = [
+            any(leaves is old for old in cached_leaves)
+            for leaves in forest._caches[0].tree_leaves  # pyright: ignore
+        ]
+        if start > 60:
+            assert reused.count(True) == 3
+
+
+def test_register_is_ignored_without_reused_trees(make_dataset: "DatasetFactory"):
+    X, _ = make_dataset(7, 120, 9)
+    for config, reused in [
+        (RandomForestConfig(n_trees=3), False),
+        (RandomForestConfig(n_trees=3, refit_fraction=0.5), True),
+        (RandomForestConfig(n_trees=3, min_trees=1), True),
+    ]:
+        forest = RandomForest(config)
+        forest.register(X)
+        assert forest.is_registered(X) == reused
+
+
+def reference_oob(forest: RandomForest, X: np.ndarray) -> np.ndarray:
+    proba = np.zeros((X.shape[0], forest.classes.size))
+    n_trees = np.zeros(X.shape[0])
+    for tree, seed, size in zip(forest._trees, forest._tree_seeds, forest._tree_sizes):  # pyright: ignore
+        sample_weight = _bootstrap(np.random.default_rng(seed), size)
+        oob = np.ones(X.shape[0], dtype=bool)
+        oob[:size] = sample_weight == 0
+
+        proba[oob] += tree.predict_proba(X[oob])
+        n_trees[oob] += 1
+
+    return proba / n_trees[:, np.newaxis]
+
+
+def test_oob_estimates(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(8, 120, 9)
+    forest = RandomForest(RandomForestConfig(n_trees=20, oob_score=True, refit_fraction=0.25))
+    forest.set_rng(0)
+    forest.fit(X[:100], y[:100])
+
+    reference = reference_oob(forest, X[:100])
+    assert np.allclose(forest.oob_proba, reference)
+    assert forest.oob_score == np.mean(np.argmax(reference, axis=1) == y[:100])
+    assert forest.diagnostics()["oob_score"] == forest.oob_score
+
+    forest.update(X[100:], y[100:])
+
+    assert np.allclose(forest.oob_proba, reference_oob(forest, X))
+
+
+def test_oob_without_out_of_bag_samples(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(9, 120, 9)
+    forest = RandomForest(RandomForestConfig(n_trees=1, oob_score=True))
+    forest.set_rng(0)
+    forest.fit(X, y)
+
+    drawn = np.isnan(forest.oob_proba[:, 0])
+    assert np.any(drawn)
+    assert not np.any(np.isnan(forest.oob_proba[~drawn]))
+
+
+def test_node_counts(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(10, 120, 9)
+    forest = RandomForest(RandomForestConfig(CARTConfig(max_leaf_nodes=4), n_trees=5))
+    forest.set_rng(0)
+    forest.fit(X, y)
+
+    assert np.array_equal(forest.node_counts, [7] * 5)
+    assert forest.diagnostics() == {"n_trees": 5.0, "nodes_per_tree": 7.0}
+
+
+def test_schedule_grows_with_labeled_set(make_dataset: "DatasetFactory"):
+    X, y = make_dataset(11, 120, 9)
+    forest = RandomForest(RandomForestConfig(n_trees=10, refit_fraction=0.25, min_trees=4))
+    forest.set_rng(0)
+    forest.register(X)
+    forest.fit(X[:40], y[:40])
+    assert len(forest._trees) == 4  # pyright: ignore
+
+    trees = list(forest._trees)  # pyright: ignore
+    forest.update(X[40:60], y[40:60])
+    assert forest.diagnostics()["n_trees"] == 6
+    assert sum(a is b for a, b in zip(trees, forest._trees, strict=False)) == 3  # pyright: ignore
+    assert np.array_equal(forest.predict_proba(X), forest.predict_proba(X.copy()))
+
+    forest.update(X[60:], y[60:])
+    assert len(forest._trees) == 10  # pyright: ignore
+
+
+@pytest.mark.parametrize(("stability_tol", "n_trees"), [(1.0, 3), (0.0, 10)])
+def test_stable_growth(stability_tol: float, n_trees: int, make_dataset: "DatasetFactory"):
+    X, y = make_dataset(12, 120, 9)
+    config = RandomForestConfig(
+        n_trees=10, min_trees=3, growth="stable", stability_tol=stability_tol, oob_score=True
+    )
+    forest = RandomForest(config)
+    forest.set_rng(0)
+    forest.fit(X, y)
+
+    assert len(forest._trees) == n_trees  # pyright: ignore
+    assert forest.oob_proba.shape == (X.shape[0], 2)
+
+
+@pytest.mark.parametrize("min_trees", [0, 11])
+def test_invalid_min_trees(min_trees: int):
+    with pytest.raises(ValueError):
+        RandomForest(RandomForestConfig(n_trees=10, min_trees=min_trees))
+
+
+@pytest.mark.parametrize("refit_fraction", [0, 1.5])
+def test_invalid_refit_fraction(refit_fraction: float):
+    with pytest.raises(ValueError):
+        RandomForest(RandomForestConfig(refit_fraction=refit_fraction))
+
+
+@pytest.fixture
+def pool():
+    yield
+    shutdown_pool()
+
+
+@pytest.mark.usefixtures("pool")
+@pytest.mark.parametrize("n_workers", [1, 2, 3])
+def test_parallel_fit_matches_serial(
+    n_workers: int, make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(0, 120, 9)
+
+    serial = fit_seeded(RandomForest(RandomForestConfig(n_trees=7)), X, y).predict_proba(X)
+    parallel = fit_seeded(
+        RandomForest(RandomForestConfig(n_trees=7, multiprocessing=True, n_workers=n_workers)), X, y
+    ).predict_proba(X)
+
+    assert np.array_equal(serial, parallel)
+
+
+@pytest.mark.usefixtures("pool")
+def test_pool_is_reused_across_fits(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(1, 120, 9)
+    config = RandomForestConfig(n_trees=4, multiprocessing=True, n_workers=2)
+
+    fit_seeded(RandomForest(config), X, y)
+    executor = get_pool(2)
+    fit_seeded(RandomForest(config), X, y)
+
+    assert get_pool(2) is executor
+    assert get_pool(3) is not executor
+    assert pool_size() == 3
+
+
+def test_shutdown_pool():
+    get_pool(1)
+    shutdown_pool()
+
+    assert pool_size() == 0
+    shutdown_pool()
+
+
+@pytest.mark.usefixtures("pool")
+@pytest.mark.parametrize("inference", ["threads", "processes"])
+@pytest.mark.parametrize("n_samples", [1, 5, 301])
+def test_parallel_inference_matches_serial(
+    inference: str, n_samples: int, make_dataset: "DatasetFactory"
+):
+    X, y = make_dataset(3, 120, 9)
+    X_test = np.random.default_rng(4).normal(size=(n_samples, 9))
+
+    serial = RandomForest(RandomForestConfig(n_trees=6))
+    serial.set_rng(0)
+    serial.fit(X, y)
+    parallel = RandomForest(RandomForestConfig(n_trees=6, n_workers=3, inference=inference))  # type: ignore
+    parallel.set_rng(0)
+    parallel.fit(X, y)
+
+    assert np.array_equal(serial.predict_proba(X_test), parallel.predict_proba(X_test))
+    assert np.array_equal(serial.predict(X_test), parallel.predict(X_test))
+
+
+def crash() -> None:
+    os._exit(1)
+
+
+@pytest.mark.usefixtures("pool")
+def test_shared_arrays_reach_workers():
+    X = np.arange(12, dtype=np.float64).reshape(3, 4)
+
+    with shared_arrays(X, None) as (X_shared, missing):
+        total = get_pool(1).submit(run_shared, np.sum, X_shared).result()
+
+    assert missing is None
+    assert total == X.sum()
+
+
+@pytest.mark.usefixtures("pool")
+def test_shared_arrays_are_unlinked_after_crash():
+    with pytest.raises(BrokenProcessPool), shared_arrays(np.ones(10)) as (X_shared,):
+        get_pool(1).submit(run_shared, crash).result()
+
+    assert X_shared is not None
+
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(X_shared.name, track=False)
@@ -1,7 +1,13 @@
 import numpy as np
 import pytest
 
-from src.models.forest.util import gini_impurity, highest_probability_arg, majority_vote
+from src.models.forest.util import (
+    gini_impurity,
+    gini_impurity_batch,
+    highest_probability_arg,
+    majority_vote,
+    split_gains,
+)
 
 
 @pytest.mark.parametrize(
@@ -48,3 +54,21 @@ def test_majority_vote(votes: np.ndarray, expected: tuple[int]):
 )
 def test_gini(array: np.ndarray, expected: float):
     assert gini_impurity(array) == expected
+
+
+def test_gini_batch_matches_gini():
+    counts = np.array([[1, 1, 1, 1], [4, 0, 0, 0], [2, 2, 0, 0], [3, 1, 0, 2]])
+    expected = [gini_impurity(row) for row in counts]
+
+    assert np.array_equal(gini_impurity_batch(counts), expected)
+
+
+def test_split_gains():
+    parent = np.array([2, 2])
+    left = np.array([[1, 0], [2, 0], [2, 1]])
+
+    gains = split_gains(left, parent)
+
+    assert gains[1] == 0.5
+    assert np.argmax(gains) == 1
+    assert np.allclose(gains[[0, 2]], 0.5 - 0.75 * (1 - (1 / 3) ** 2 - (2 / 3) ** 2))
@@ -0,0 +1,118 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pytest
+
+from src.models.forest.cart import CARTConfig
+from src.models.forest.forest import RandomForest, RandomForestConfig
+from src.models.serialization import MAGIC, load_arrays, save_arrays
+from src.models.svm.svm import SVM, SVMConfig
+
+if TYPE_CHECKING:
+    from tests.conftest import DatasetFactory, SeededFit
+
+
+def test_arrays_round_trip(tmp_path: Path):
+    arrays = {
+        "floats": np.random.default_rng(0).normal(size=(7, 3)),
+        "ints": np.arange(5, dtype=np.int32),
+        "labels": np.array(["cat", "dog"]),
+        "empty": np.empty((0, 4)),
+        "transposed": np.arange(6.0).reshape(2, 3).T,
+    }
+    save_arrays(tmp_path / "model.bin", "test", arrays)
+
+    for mmap in [True, False]:
+        loaded = load_arrays(tmp_path / "model.bin", "test", mmap)
+
+        assert loaded.keys() == arrays.keys()
+        for name, array in arrays.items():
+            assert loaded[name].dtype == array.dtype
+            assert np.array_equal(loaded[name], array)
+
+
+def test_load_checks_header(tmp_path: Path):
+    path = tmp_path / "model.bin"
+    save_arrays(path, "svm", {"w": np.ones(3)})
+
+    with pytest.raises(ValueError, match="expected forest"):
+        load_arrays(path, "forest")
+
+    content = path.read_bytes()
+    path.write_bytes(content[: len(MAGIC)] + b"\x63" + content[len(MAGIC) + 1 :])
+    with pytest.raises(ValueError, match="version"):
+        load_arrays(path, "svm")
+
+    path.write_bytes(b"not a model" + content)
+    with pytest.raises(ValueError, match="not a model file"):
+        load_arrays(path, "svm")
+
+
+def test_object_arrays_are_rejected(tmp_path: Path):
+    with pytest.raises(ValueError):
+        save_arrays(tmp_path / "model.bin", "test", {"labels": np.array([1, "a"], dtype=object)})
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+@pytest.mark.parametrize("max_bins", [None, 32])
+def test_forest_round_trip(
+    tmp_path: Path,
+    mmap: bool,
+    max_bins: int | None,
+    make_dataset: "DatasetFactory",
+    fit_seeded: "SeededFit",
+):
+    X, y = make_dataset(0, 150, 9)
+    X_test, _ = make_dataset(3, 80, 9)
+    labels = np.array(["negative", "positive"])[y]
+    config = RandomForestConfig(CARTConfig(max_bins=max_bins), n_trees=10)
+    forest = fit_seeded(RandomForest(config), X, labels)
+
+    forest.save(tmp_path / "forest.bin")
+    loaded = RandomForest.load(tmp_path / "forest.bin", mmap=mmap)
+
+    assert np.array_equal(loaded.predict_proba(X_test), forest.predict_proba(X_test))
+    assert np.array_equal(loaded.predict(X_test), forest.predict(X_test))
+    assert isinstance(loaded._trees[0].tree.threshold, np.memmap) == mmap  # pyright: ignore
+
+
+def test_loaded_forest_cannot_update(
+    tmp_path: Path, make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(1, 150, 9)
+    forest = fit_seeded(RandomForest(RandomForestConfig(n_trees=3)), X, y)
+    forest.save(tmp_path / "forest.bin")
+
+    loaded = RandomForest.load(tmp_path / "forest.bin")
+
+    with pytest.raises(ValueError):
+        loaded.update(X[:5], y[:5])
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+@pytest.mark.parametrize("feature_map", ["none", "fourier", "nystroem"])
+def test_svm_round_trip(
+    tmp_path: Path,
+    mmap: bool,
+    feature_map: Literal["none", "fourier", "nystroem"],
+    make_dataset: "DatasetFactory",
+    fit_seeded: "SeededFit",
+):
+    X, y = make_dataset(2, 150, 9)
+    X_test, _ = make_dataset(4, 80, 9)
+    config = SVMConfig(iter_count=5, feature_map=feature_map, n_components=32)
+    svm = fit_seeded(SVM(config), X, y)
+
+    svm.save(tmp_path / "svm.bin")
+    loaded = SVM.load(tmp_path / "svm.bin", mmap=mmap)
+
+    assert np.array_equal(loaded.predict_proba(X_test), svm.predict_proba(X_test))
+    assert np.array_equal(loaded.predict(X_test), svm.predict(X_test))
+
+
+def test_untrained_models_cannot_be_saved(tmp_path: Path):
+    with pytest.raises(ValueError):
+        SVM().save(tmp_path / "svm.bin")
+    with pytest.raises(ValueError):
+        RandomForest().save(tmp_path / "forest.bin")
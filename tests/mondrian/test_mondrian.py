@@ -0,0 +1,124 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from src.models.mondrian.mondrian import MondrianForest, MondrianForestConfig, MondrianTree
+
+if TYPE_CHECKING:
+    from tests.conftest import DatasetFactory, SeededFit
+
+
+@pytest.mark.parametrize("lifetime", [None, 2.0])
+def test_fits_separable_data(
+    lifetime: float | None, make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(0)
+    X_test, y_test = make_dataset(1)
+    forest = fit_seeded(
+        MondrianForest(MondrianForestConfig(lifetime=lifetime, max_features=None)), X, y
+    )
+
+    proba = forest.predict_proba(X_test)
+    assert proba.shape == (X_test.shape[0], 2)
+    assert np.allclose(proba.sum(axis=1), 1)
+    assert np.mean(forest.predict(X_test) == y_test) > 0.85
+
+
+def test_update_matches_fit(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(2)
+    fitted = fit_seeded(MondrianForest(MondrianForestConfig()), X, y)
+
+    updated = fit_seeded(MondrianForest(MondrianForestConfig()), X[:60], y[:60])
+    updated.update(X[60:100], y[60:100])
+    updated.update(X[100:], y[100:])
+
+    assert updated.node_counts == fitted.node_counts
+    assert np.array_equal(updated.predict_proba(X), fitted.predict_proba(X))
+
+
+def test_update_adds_classes(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(3)
+    labels = np.where(y == 1, "b", "c")
+    forest = fit_seeded(MondrianForest(MondrianForestConfig(n_trees=3)), X[:100], labels[:100])
+
+    labels[100:110] = "a"
+    forest.update(X[100:], labels[100:])
+
+    assert np.array_equal(forest._classes, ["a", "b", "c"])  # pyright: ignore
+    assert np.array_equal(
+        forest._labels[: X.shape[0]],  # pyright: ignore
+        np.searchsorted(["a", "b", "c"], labels),
+    )
+    assert forest.predict_proba(X).shape == (X.shape[0], 3)
+    assert np.array_equal(forest.predict(X[100:110]), labels[100:110])
+
+
+def test_leaves_hold_their_samples(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(4)
+    forest = fit_seeded(MondrianForest(MondrianForestConfig(n_trees=3)), X, y)
+
+    for tree in forest._trees:  # pyright: ignore
+        held = np.concatenate([np.array(samples) for samples in tree.samples.values()])
+        assert np.array_equal(np.sort(held), np.arange(X.shape[0]))
+        assert tree.counts[tree.root].sum() == X.shape[0]
+
+        for leaf, samples in tree.samples.items():
+            points = X[np.ix_(samples, tree.features)]
+            assert np.array_equal(tree.lower[leaf], points.min(axis=0))
+            assert np.array_equal(tree.upper[leaf], points.max(axis=0))
+
+
+@pytest.mark.parametrize(
+    ("X", "lifetime"),
+    [
+        (np.zeros((20, 1)), None),
+        (np.concatenate(([[0.0], [1.0]], np.linspace(0.1, 0.9, 18)[:, np.newaxis])), 1e-9),
+    ],
+)
+def test_leaves_that_cannot_split_are_paused(
+    X: np.ndarray, lifetime: float | None, monkeypatch: pytest.MonkeyPatch, fit_seeded: "SeededFit"
+):
+    calls: list[int] = []
+    split_leaf = MondrianTree._split_leaf  # pyright: ignore
+
+    def counting_split_leaf(tree: MondrianTree, X: np.ndarray, labels: np.ndarray, leaf: int):
+        calls.append(leaf)
+        split_leaf(tree, X, labels, leaf)
+
+    monkeypatch.setattr(MondrianTree, "_split_leaf", counting_split_leaf)
+    config = MondrianForestConfig(n_trees=1, lifetime=lifetime, max_features=None)
+    forest = fit_seeded(MondrianForest(config), X, np.arange(20) % 2)
+
+    tree = forest._trees[0]  # pyright: ignore
+    assert tree.node_count == 1 and tree.paused == {tree.root}
+    assert len(calls) == 1
+
+
+def test_uncertain_away_from_data(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(5)
+    forest = fit_seeded(MondrianForest(MondrianForestConfig()), X, y)
+
+    near = forest.predict_proba(X).max(axis=1)
+    far = forest.predict_proba(X + 50).max(axis=1)
+
+    assert np.all(far < near.mean())
+    assert np.allclose(far, 0.5, atol=0.1)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        MondrianForestConfig(lifetime=0),
+        MondrianForestConfig(smoothing=0),
+        MondrianForestConfig(max_features="all"),  # pyright: ignore
+    ],
+)
+def test_invalid_config(config: MondrianForestConfig):
+    with pytest.raises(ValueError):
+        MondrianForest(config)
+
+
+def test_predict_before_fit():
+    with pytest.raises(ValueError):
+        MondrianForest().predict_proba(np.zeros((1, 2)))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from src.models.svm.feature_map import FourierFeatures, NystroemFeatures
+
+
+def rbf_kernel(X: np.ndarray, Y: np.ndarray, gamma: float) -> np.ndarray:
+    X_scaled = (X - X.mean(axis=0)) / X.std(axis=0)
+    Y_scaled = (Y - X.mean(axis=0)) / X.std(axis=0)
+    distances = ((X_scaled[:, np.newaxis] - Y_scaled) ** 2).sum(axis=2)
+    return np.exp(-gamma * distances)
+
+
+def test_fourier_features_approximate_rbf_kernel():
+    X = np.random.default_rng(0).normal(loc=2.0, scale=3.0, size=(60, 5))
+    feature_map = FourierFeatures.draw(X, 4000, 0.2, np.random.default_rng(1))
+
+    Z = feature_map.transform(X)
+
+    assert Z.shape == (60, 4000)
+    assert np.abs(Z @ Z.T - rbf_kernel(X, X, 0.2)).max() < 0.1
+
+
+def test_nystroem_features_are_exact_on_landmarks():
+    X = np.random.default_rng(0).normal(loc=2.0, scale=3.0, size=(60, 5))
+    feature_map = NystroemFeatures.draw(X, 60, 0.2, np.random.default_rng(1))
+
+    Z = feature_map.transform(X)
+
+    assert np.allclose(Z @ Z.T, rbf_kernel(X, X, 0.2), atol=1e-6)
+
+
+def test_nystroem_landmarks_are_capped_by_samples():
+    X = np.random.default_rng(0).normal(size=(20, 3))
+    feature_map = NystroemFeatures.draw(X, 50, 1.0, np.random.default_rng(1))
+
+    assert feature_map.landmarks.shape == (20, 3)
+    assert feature_map.transform(X[:4]).shape == (4, 20)
+    assert np.unique(feature_map.landmarks, axis=0).shape[0] == 20
+
+
+@pytest.mark.parametrize("feature_map", [FourierFeatures, NystroemFeatures])
+def test_constant_features_are_ignored(feature_map: type[FourierFeatures | NystroemFeatures]):
+    X = np.random.default_rng(0).normal(size=(30, 3))
+    X[:, 1] = 4.0
+
+    assert np.all(np.isfinite(feature_map.draw(X, 10, 1.0, np.random.default_rng(1)).transform(X)))
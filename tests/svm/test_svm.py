@@ -0,0 +1,256 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pytest
+from sklearn.svm import LinearSVC
+
+from src.models.svm.svm import SVM, SVMConfig
+
+if TYPE_CHECKING:
+    from tests.conftest import DatasetFactory, SeededFit
+
+
+def score(X: np.ndarray) -> np.ndarray:
+    return X[:, 0] - X[:, 3]
+
+
+def objective(svm: SVM, X: np.ndarray, y: np.ndarray) -> float:
+    assert svm.w is not None and svm.b is not None
+    signs = np.where(y <= 0, -1, 1)
+    margins = signs * (svm._standardize(X) @ svm.w + svm.b)  # pyright: ignore
+    return float(
+        svm.w @ svm.w / (2 * svm.penalty * X.shape[0]) + np.mean(np.maximum(0, 1 - margins))
+    )
+
+
+def per_sample_pegasos(svm: SVM, X: np.ndarray, y: np.ndarray, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    X_scaled = (X - X.mean(axis=0)) / X.std(axis=0)
+    signs = np.where(y <= 0, -1, 1)
+    lambda_param = 1.0 / (svm.penalty * X.shape[0])
+    w, b, step = np.zeros(X.shape[1]), 0.0, 0
+
+    for _ in range(svm.iter_count):
+        for idx in rng.permutation(X.shape[0]):
+            step += 1
+            eta = svm.learning_rate / (1.0 + svm.learning_rate * lambda_param * step)
+            violated = signs[idx] * (np.dot(X_scaled[idx], w) + b) < 1
+            w = (1 - eta * lambda_param) * w
+            if violated:
+                w = w + eta * signs[idx] * X_scaled[idx]
+                b += eta * signs[idx]
+
+    return np.append(w, b)
+
+
+def test_single_sample_batches_match_pegasos(
+    make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(0, 200, 8, noise=0.25, score=score)
+    svm = fit_seeded(SVM(SVMConfig(iter_count=5)), X, y)
+
+    assert svm.w is not None and svm.b is not None
+    assert np.allclose(np.append(svm.w, svm.b), per_sample_pegasos(svm, X, y, 0))
+
+
+@pytest.mark.parametrize("batch_size", [16, 64, 1000])
+def test_mini_batches_converge_like_per_sample(
+    batch_size: int, make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(1, 200, 8, noise=0.25, score=score)
+    X_test, y_test = make_dataset(2, 200, 8, noise=0.25, score=score)
+    config = SVMConfig(learning_rate=0.01, penalty=1, iter_count=50)
+    per_sample = fit_seeded(SVM(config), X, y)
+    config.batch_size = batch_size
+    batched = fit_seeded(SVM(config), X, y)
+
+    assert objective(batched, X, y) < 1.1 * objective(per_sample, X, y)
+    assert (
+        np.mean(batched.predict(X_test) == y_test)
+        >= np.mean(per_sample.predict(X_test) == y_test) - 0.03
+    )
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        SVM(SVMConfig(batch_size=0))
+
+
+def test_tolerance_stops_early(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(3, 200, 8, noise=0.25, score=score)
+    config = SVMConfig(learning_rate=0.01, penalty=1, iter_count=300, batch_size=16)
+    full = fit_seeded(SVM(config), X, y)
+    config.tol = 1e-3
+    stopped = fit_seeded(SVM(config), X, y)
+
+    assert full.diagnostics() == {"epochs": 300}
+    assert stopped.n_epochs < 300
+    assert objective(stopped, X, y) < objective(full, X, y) + 0.05
+
+
+def test_average_of_iterates(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(4, 200, 8, noise=0.25, score=score)
+    config = SVMConfig(iter_count=1, batch_size=X.shape[0])
+    first = fit_seeded(SVM(config), X, y)
+    config.iter_count = 2
+    second = fit_seeded(SVM(config), X, y)
+    config.average = True
+    averaged = fit_seeded(SVM(config), X, y)
+
+    assert first.w is not None and second.w is not None and averaged.w is not None
+    assert np.allclose(averaged.w, (first.w + second.w) / 2)
+    assert np.isclose(averaged.b, (first.b + second.b) / 2)  # pyright: ignore
+
+
+def test_invalid_n_iter_no_change():
+    with pytest.raises(ValueError):
+        SVM(SVMConfig(n_iter_no_change=0))
+
+
+def test_update_without_warm_start_refits(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(5, 200, 8, noise=0.25, score=score)
+    updated = fit_seeded(SVM(SVMConfig(iter_count=5)), X[:150], y[:150])
+    updated.update(X[150:], y[150:])
+    refit = fit_seeded(SVM(SVMConfig(iter_count=5)), X[:150], y[:150])
+    refit.fit(X, y)
+
+    assert np.array_equal(updated.predict_proba(X), refit.predict_proba(X))
+
+
+def test_warm_start_merges_standardization(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(6, 200, 8, noise=0.25, score=score)
+    svm = fit_seeded(SVM(SVMConfig(iter_count=20, warm_start=True)), X[:120], y[:120])
+    decision = svm._decision_function(X)  # pyright: ignore
+
+    svm.iter_count = 0
+    svm.update(X[120:170], y[120:170])
+    svm.update(X[170:], y[170:])
+
+    assert np.allclose(svm.feature_mean, X.mean(axis=0))  # pyright: ignore
+    assert np.allclose(svm.feature_scale, X.std(axis=0))  # pyright: ignore
+    assert np.allclose(svm._decision_function(X), decision)  # pyright: ignore
+
+
+def test_warm_start_reconverges_quickly(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(7, 200, 8, noise=0.25, score=score)
+    config = SVMConfig(learning_rate=0.01, penalty=1, iter_count=200, batch_size=16, tol=1e-4)
+    cold = fit_seeded(SVM(config), X, y)
+
+    config.warm_start = True
+    warm = fit_seeded(SVM(config), X[:180], y[:180])
+    warm.update(X[180:], y[180:])
+
+    assert warm.n_epochs < cold.n_epochs
+    assert objective(warm, X, y) < objective(cold, X, y) + 0.02
+
+
+def test_update_of_loaded_svm(
+    tmp_path: Path, make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(8, 200, 8, noise=0.25, score=score)
+    fit_seeded(SVM(SVMConfig(iter_count=2)), X, y).save(tmp_path / "svm.bin")
+
+    with pytest.raises(ValueError):
+        SVM.load(tmp_path / "svm.bin").update(X, y)
+
+
+@pytest.mark.parametrize("loss", ["hinge", "squared_hinge"])
+@pytest.mark.parametrize("penalty", [0.1, 1.0])
+def test_dual_cd_matches_liblinear(
+    loss: Literal["hinge", "squared_hinge"],
+    penalty: float,
+    make_dataset: "DatasetFactory",
+    fit_seeded: "SeededFit",
+):
+    X, y = make_dataset(9, 200, 8, noise=0.25, score=score)
+    svm = fit_seeded(SVM(SVMConfig(penalty=penalty, solver="dual_cd", loss=loss, tol=1e-8)), X, y)
+    reference = LinearSVC(C=penalty, loss=loss, tol=1e-10, max_iter=100_000)
+    reference.fit(svm._standardize(X), y)  # pyright: ignore
+
+    assert svm.w is not None
+    assert np.allclose(svm.w, reference.coef_.ravel(), atol=1e-5)
+    assert np.isclose(svm.b, reference.intercept_[0], atol=1e-5)  # pyright: ignore
+
+
+def test_dual_cd_warm_start_reaches_same_optimum(
+    make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(10, 200, 8, noise=0.25, score=score)
+    config = SVMConfig(penalty=1.0, solver="dual_cd", tol=1e-8, warm_start=True)
+    cold = fit_seeded(SVM(config), X, y)
+    warm = fit_seeded(SVM(config), X[:150], y[:150])
+    warm.update(X[150:], y[150:])
+
+    assert warm.n_epochs < cold.n_epochs
+    assert np.allclose(warm.w, cold.w, atol=1e-5)  # pyright: ignore
+
+
+def test_pegasos_rejects_squared_hinge():
+    with pytest.raises(ValueError):
+        SVM(SVMConfig(loss="squared_hinge"))
+
+
+def make_circles(seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, 2))
+    y = (np.linalg.norm(X, axis=1) > 1.2).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize("feature_map", ["fourier", "nystroem"])
+def test_feature_map_separates_circles(
+    feature_map: Literal["fourier", "nystroem"], fit_seeded: "SeededFit"
+):
+    X, y = make_circles(0)
+    X_test, y_test = make_circles(1)
+
+    linear = fit_seeded(SVM(SVMConfig(iter_count=20)), X, y)
+    kernel = fit_seeded(
+        SVM(SVMConfig(iter_count=20, feature_map=feature_map, n_components=100)), X, y
+    )
+
+    assert np.mean(linear.predict(X_test) == y_test) < 0.8
+    assert np.mean(kernel.predict(X_test) == y_test) > 0.9
+
+
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_feature_map_is_kept_across_refits(
+    warm_start: bool, make_dataset: "DatasetFactory", fit_seeded: "SeededFit"
+):
+    X, y = make_dataset(0, 200, 8, noise=0.25, score=score)
+    svm = fit_seeded(
+        SVM(
+            SVMConfig(iter_count=3, feature_map="nystroem", n_components=50, warm_start=warm_start)
+        ),
+        X[:100],
+        y[:100],
+    )
+    feature_map = svm.feature_map
+
+    svm.update(X[100:], y[100:])
+    assert svm.feature_map is feature_map
+    assert svm._X_train is not None and svm._X_train.shape == (200, 50)  # pyright: ignore
+
+    svm.fit(X, y)
+    assert svm.feature_map is feature_map
+
+    svm.set_rng(1)
+    svm.fit(X, y)
+    assert svm.feature_map is not feature_map
+
+
+def test_feature_map_is_seeded(make_dataset: "DatasetFactory", fit_seeded: "SeededFit"):
+    X, y = make_dataset(0, 200, 8, noise=0.25, score=score)
+    config = SVMConfig(iter_count=3, feature_map="fourier", n_components=50)
+
+    first, second = fit_seeded(SVM(config), X, y), fit_seeded(SVM(config), X, y)
+
+    assert np.array_equal(first.predict_proba(X), second.predict_proba(X))
+
+
+def test_invalid_feature_map_parameters():
+    with pytest.raises(ValueError):
+        SVM(SVMConfig(n_components=0))
+    with pytest.raises(ValueError):
+        SVM(SVMConfig(gamma=0.0))